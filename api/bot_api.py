@@ -3,10 +3,13 @@ Web API for Bot Statistics
 Provides a simple Flask API to serve bot stats to the website
 """
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from flask_cors import CORS
+import asyncio
+import hmac
 import threading
 from datetime import datetime
+from config import Config
 
 class BotAPI:
     def __init__(self, bot):
@@ -55,15 +58,9 @@ class BotAPI:
                 memory_mb = round(process.memory_info().rss / 1024 / 1024)
                 
                 # Check database status
-                try:
-                    # Test database connection
-                    if hasattr(self.bot, 'db'):
-                        self.bot.db.execute("SELECT 1")
-                        db_status = "Online"
-                    else:
-                        db_status = "Online"
-                except:
-                    db_status = "Offline"
+                db = getattr(self.bot, 'db', None)
+                gaming = self.bot.get_cog('Gaming')
+                db_status = "Online" if db is not None and db.connected else "Offline"
                 
                 stats = {
                     'status': 'online',
@@ -74,6 +71,10 @@ class BotAPI:
                     'latency': round(self.bot.latency * 1000),  # ms
                     'memory': memory_mb,  # MB
                     'database_status': db_status,
+                    'pragma_profile': dict(db.pragma_profile) if db is not None else {},
+                    'cache_stats': db.cache_stats() if db is not None else {},
+                    'steam_cache_stats': gaming.cache_stats() if gaming is not None else {},
+                    'http_stats': self.bot.http_client.stats(),
                     'timestamp': datetime.now().isoformat()
                 }
                 
@@ -84,6 +85,27 @@ class BotAPI:
                     'error': str(e)
                 }), 500
         
+        @self.app.route('/api/backup', methods=['POST'])
+        def create_backup():
+            """Take a database backup (requires the API token)"""
+            if not Config.API_TOKEN:
+                return jsonify({'status': 'error', 'error': 'API token not configured'}), 403
+            
+            supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+            if not hmac.compare_digest(supplied.encode(), Config.API_TOKEN.encode()):
+                return jsonify({'status': 'error', 'error': 'Unauthorized'}), 401
+            
+            try:
+                # Flask runs in its own thread; the backup runs on the bot's loop
+                future = asyncio.run_coroutine_threadsafe(self.bot.backups.create(), self.bot.loop)
+                result = future.result(timeout=600)
+                return jsonify({'status': 'ok', 'backup': result, 'timestamp': datetime.now().isoformat()})
+            except Exception as e:
+                return jsonify({
+                    'status': 'error',
+                    'error': str(e)
+                }), 500
+        
         @self.app.route('/api/health', methods=['GET'])
         def health_check():
             """Health check endpoint"""
@@ -8,6 +8,8 @@ from datetime import datetime
 from config import Config
 from api.bot_api import BotAPI
 from utils.database import Database
+from utils.backup import BackupManager
+from utils.http import HTTPClient
 
 # Setup logging
 logging.basicConfig(
@@ -34,12 +36,15 @@ class MegaBot(commands.Bot):
         self.start_time = datetime.now()
         self.config = Config
         self.db = Database()  # Initialize database
+        self.backups = BackupManager(self.db.db_path)
+        self.http_client = HTTPClient()  # Shared by every cog that calls external APIs
         
     async def setup_hook(self):
         """Load all cogs when bot starts"""
         # Connect to database first
         logger.info("Connecting to database...")
         await self.db.connect()
+        await self.http_client.start()
         
         logger.info("Loading cogs...")
         
@@ -71,6 +76,12 @@ class MegaBot(commands.Bot):
         except Exception as e:
             logger.error(f"[ERROR] Failed to sync commands: {e}")
     
+    async def close(self):
+        """Unload cogs first so their loops stop, then drain HTTP connections and the database"""
+        await super().close()
+        await self.http_client.close()
+        await self.db.close()
+    
     async def on_ready(self):
         """Called when bot is ready"""
         logger.info(f"BOT ONLINE: {self.user.name}")
@@ -183,10 +194,6 @@ def main():
         logger.info("Bot shutdown requested...")
     except Exception as e:
         logger.error(f"[ERROR] Failed to start bot: {e}")
-    finally:
-        # Close database connection on shutdown
-        import asyncio
-        asyncio.run(bot.db.close())
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,6 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from config import Config
 import logging
 
@@ -20,6 +20,11 @@ class Admin(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
+        if Config.BACKUP_INTERVAL_HOURS > 0:
+            self.scheduled_backup.start()
+    
+    def cog_unload(self):
+        self.scheduled_backup.cancel()
     
     @app_commands.command(name="adminpanel", description="[ADMIN ONLY] View admin panel")
     @is_admin()
@@ -37,7 +42,8 @@ class Admin(commands.Cog):
                 "`/setbalance <user> <amount>` - Set user's balance\n"
                 "`/addbalance <user> <amount>` - Add money to user\n"
                 "`/removebalance <user> <amount>` - Remove money from user\n"
-                "`/resetbalance <user>` - Reset user's balance to starting amount"
+                "`/resetbalance <user>` - Reset user's balance to starting amount\n"
+                "`/rolebalance <role> <amount>` - Add or remove money for everyone in a role"
             ),
             inline=False
         )
@@ -68,7 +74,7 @@ class Admin(commands.Cog):
             value=(
                 "`/viewuserdata <user>` - View complete user data\n"
                 "`/resetuser <user>` - Complete user data reset\n"
-                "`/backup` - Create database backup (Coming soon)"
+                "`/backup` - Create a verified database backup"
             ),
             inline=False
         )
@@ -90,12 +96,11 @@ class Admin(commands.Cog):
             )
             return
         
-        # Get current balance
-        current_balance = await self.bot.db.get_balance(user.id, guild_id)
+        # Read the old balance without creating the account (set_balance does that)
+        current_balance = (await self.bot.db.get_balances([user.id], guild_id))[user.id]
         
-        # Calculate difference and update
-        difference = amount - current_balance
-        await self.bot.db.update_balance(user.id, difference, guild_id)
+        # Overwrite in one statement so concurrent changes aren't double-counted
+        await self.bot.db.set_balance(user.id, guild_id, amount)
         
         embed = discord.Embed(
             title="✅ Balance Updated",
@@ -123,8 +128,8 @@ class Admin(commands.Cog):
             )
             return
         
-        current_balance = await self.bot.db.get_balance(user.id, guild_id)
-        new_balance = await self.bot.db.update_balance(user.id, amount, guild_id)
+        new_balance = await self.bot.db.adjust_balance(user.id, guild_id, amount)
+        current_balance = new_balance - amount
         
         embed = discord.Embed(
             title="✅ Money Added",
@@ -152,8 +157,8 @@ class Admin(commands.Cog):
             )
             return
         
-        current_balance = await self.bot.db.get_balance(user.id, guild_id)
-        new_balance = await self.bot.db.update_balance(user.id, -amount, guild_id)
+        new_balance = await self.bot.db.adjust_balance(user.id, guild_id, -amount)
+        current_balance = new_balance + amount
         
         embed = discord.Embed(
             title="✅ Money Removed",
@@ -174,9 +179,8 @@ class Admin(commands.Cog):
         """Reset user's balance to starting amount (1000)"""
         guild_id = interaction.guild.id if interaction.guild else 0
         
-        current_balance = await self.bot.db.get_balance(user.id, guild_id)
-        difference = 1000 - current_balance
-        await self.bot.db.update_balance(user.id, difference, guild_id)
+        current_balance = (await self.bot.db.get_balances([user.id], guild_id))[user.id]
+        await self.bot.db.set_balance(user.id, guild_id, 1000)
         
         embed = discord.Embed(
             title="✅ Balance Reset",
@@ -290,13 +294,8 @@ class Admin(commands.Cog):
         """Clear user's entire inventory"""
         guild_id = interaction.guild.id if interaction.guild else 0
         
-        # Get current inventory
-        items = await self.bot.db.get_inventory(user.id, guild_id)
-        item_count = len(items)
-        
-        # Clear all items
-        for item in items:
-            await self.bot.db.remove_inventory_item(user.id, guild_id, item['item_name'])
+        # Clear all items in one statement
+        item_count = await self.bot.db.clear_inventory(user.id, guild_id)
         
         embed = discord.Embed(
             title="✅ Inventory Cleared",
@@ -362,17 +361,12 @@ class Admin(commands.Cog):
         """View complete user data"""
         guild_id = interaction.guild.id if interaction.guild else 0
         
-        # Get balance
-        balance = await self.bot.db.get_balance(user.id, guild_id)
-        
-        # Get inventory
-        items = await self.bot.db.get_inventory(user.id, guild_id)
-        
-        # Get active boosts
-        boosts = await self.bot.db.get_active_boosts(user.id, guild_id)
-        
-        # Get rob stats
-        rob_stats = await self.bot.db.get_rob_stats(user.id, guild_id)
+        # Balance, inventory, boosts and rob stats in one read
+        snapshot = await self.bot.db.get_user_snapshot(user.id, guild_id)
+        balance = snapshot['balance']
+        items = snapshot['inventory']
+        boosts = snapshot['boosts']
+        rob_stats = snapshot['rob_stats']
         
         embed = discord.Embed(
             title=f"🔍 Complete User Data: {user.display_name}",
@@ -415,17 +409,8 @@ class Admin(commands.Cog):
         
         guild_id = interaction.guild.id if interaction.guild else 0
         
-        # Reset balance to starting amount
-        current_balance = await self.bot.db.get_balance(user.id, guild_id)
-        difference = 1000 - current_balance
-        await self.bot.db.update_balance(user.id, difference, guild_id)
-        
-        # Clear inventory
-        items = await self.bot.db.get_inventory(user.id, guild_id)
-        for item in items:
-            await self.bot.db.remove_inventory_item(user.id, guild_id, item['item_name'])
-        
-        # Clear boosts (handled automatically by expiry)
+        # Balance, inventory and boosts reset in one transaction
+        cleared = await self.bot.db.reset_user(user.id, guild_id, 1000)
         
         embed = discord.Embed(
             title="✅ User Reset Complete",
@@ -433,13 +418,121 @@ class Admin(commands.Cog):
             color=Config.COLOR_SUCCESS
         )
         embed.add_field(name="Balance", value="Reset to $1,000", inline=True)
-        embed.add_field(name="Inventory", value=f"Cleared {len(items)} items", inline=True)
+        embed.add_field(name="Inventory", value=f"Cleared {cleared['items']} items", inline=True)
+        embed.add_field(name="Boosts", value=f"Cleared {cleared['boosts']} boosts", inline=True)
         embed.add_field(name="⚠️ Warning", value="This action cannot be undone!", inline=False)
         embed.set_footer(text=f"Admin: {interaction.user.name}")
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
         logger.warning(f"Admin {interaction.user.name} performed full reset on {user.name}")
     
+    @app_commands.command(name="clearboosts", description="[ADMIN ONLY] Clear all boosts from a user")
+    @app_commands.describe(user="User to clear boosts from")
+    @is_admin()
+    async def clearboosts(self, interaction: discord.Interaction, user: discord.Member):
+        """Remove every boost a user has"""
+        guild_id = interaction.guild.id if interaction.guild else 0
+        
+        removed = await self.bot.db.clear_boosts(user.id, guild_id)
+        
+        embed = discord.Embed(
+            title="✅ Boosts Cleared",
+            description=f"Cleared all of **{user.display_name}**'s boosts",
+            color=Config.COLOR_SUCCESS
+        )
+        embed.add_field(name="Boosts Removed", value=str(removed), inline=True)
+        embed.set_footer(text=f"Admin: {interaction.user.name}")
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        logger.info(f"Admin {interaction.user.name} cleared {user.name}'s boosts")
+    
+    @app_commands.command(name="rolebalance", description="[ADMIN ONLY] Adjust the balance of everyone in a role")
+    @app_commands.describe(role="Role whose members to adjust", amount="Amount to add (negative to remove)")
+    @is_admin()
+    async def rolebalance(self, interaction: discord.Interaction, role: discord.Role, amount: int):
+        """Add or remove money for every member of a role"""
+        members = [member.id for member in role.members if not member.bot]
+        if not members:
+            await interaction.response.send_message(
+                f"{Config.EMOJI_ERROR} {role.name} has no members!",
+                ephemeral=True
+            )
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        async def report(done: int, total: int):
+            # Only large roles take long enough to need progress updates
+            if done < total:
+                await interaction.edit_original_response(
+                    content=f"{Config.EMOJI_LOADING} Updated {done:,}/{total:,} members of {role.name}..."
+                )
+        
+        updated = await self.bot.db.adjust_balances(members, interaction.guild.id, amount, on_progress=report)
+        
+        embed = discord.Embed(
+            title="✅ Role Balance Adjusted",
+            description=f"{'Added' if amount >= 0 else 'Removed'} **${abs(amount):,}** for everyone in {role.mention}",
+            color=Config.COLOR_SUCCESS
+        )
+        embed.add_field(name="Members Updated", value=f"{updated:,}", inline=True)
+        if amount < 0:
+            embed.add_field(name="Note", value="Balances stop at $0", inline=True)
+        embed.set_footer(text=f"Admin: {interaction.user.name}")
+        
+        await interaction.edit_original_response(content=None, embed=embed)
+        logger.info(f"Admin {interaction.user.name} adjusted {updated} balances in role {role.name} by ${amount}")
+    
+    @app_commands.command(name="backup", description="[ADMIN ONLY] Create a database backup")
+    @is_admin()
+    async def backup(self, interaction: discord.Interaction):
+        """Take an online backup of the database"""
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            result = await self.bot.backups.create()
+        except Exception as e:
+            logger.error(f"Backup failed: {e}")
+            await interaction.edit_original_response(content=f"{Config.EMOJI_ERROR} Backup failed: {e}")
+            return
+        
+        embed = discord.Embed(
+            title="✅ Backup Created",
+            description=f"`{result['name']}`",
+            color=Config.COLOR_SUCCESS
+        )
+        embed.add_field(name="Size", value=f"{result['size'] / 1024 / 1024:.2f} MB", inline=True)
+        embed.add_field(name="Pages", value=f"{result['pages']:,}", inline=True)
+        embed.add_field(name="Took", value=f"{result['seconds']:.2f}s", inline=True)
+        embed.add_field(name="Integrity Check", value="Passed", inline=True)
+        embed.add_field(
+            name="Retention",
+            value=f"{result['kept']} kept, {len(result['removed'])} removed",
+            inline=True
+        )
+        embed.set_footer(text=f"Admin: {interaction.user.name}")
+        
+        await interaction.edit_original_response(embed=embed)
+        logger.info(f"Admin {interaction.user.name} created backup {result['name']}")
+    
+    @tasks.loop(hours=Config.BACKUP_INTERVAL_HOURS)
+    async def scheduled_backup(self):
+        """Back up the database on a schedule"""
+        # Don't take a fresh copy on every restart if a recent one exists
+        age = self.bot.backups.latest_age()
+        if self.scheduled_backup.current_loop == 0 and age is not None and age < Config.BACKUP_INTERVAL_HOURS * 3600:
+            return
+        
+        try:
+            await self.bot.backups.create()
+        except Exception as e:
+            # Keep the schedule running; the next run may succeed
+            logger.error(f"Scheduled backup failed: {e}")
+    
+    @scheduled_backup.before_loop
+    async def before_scheduled_backup(self):
+        await self.bot.wait_until_ready()
+    
     @adminpanel.error
     @setbalance.error
     @addbalance.error
@@ -451,6 +544,9 @@ class Admin(commands.Cog):
     @viewinventory.error
     @viewuserdata.error
     @resetuser.error
+    @clearboosts.error
+    @rolebalance.error
+    @backup.error
     async def admin_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
         """Handle admin command errors"""
         if isinstance(error, app_commands.CheckFailure):
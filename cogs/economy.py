@@ -1,27 +1,152 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from config import Config
+import asyncio
 import logging
 import random
-from datetime import datetime, timedelta
+import time
+from typing import Optional
 
 logger = logging.getLogger('MegaBot.Economy')
 
+LEADERBOARD_PAGE_SIZE = 10
+
+class LeaderboardView(discord.ui.View):
+    """Button navigation over keyset-paginated leaderboard pages"""
+    
+    def __init__(self, db, guild: discord.Guild, author_id: int):
+        super().__init__(timeout=180)
+        self.db = db
+        self.guild = guild
+        self.author_id = author_id
+        self.message: Optional[discord.Message] = None
+        
+        # Pages seen so far as (entries, cursor after the last row, more rows exist)
+        self.pages = []
+        self.index = 0
+        self._prefetch: Optional[asyncio.Task] = None
+    
+    async def fetch_page(self, cursor):
+        """Collect one page of members still in the guild, starting after cursor"""
+        entries = []
+        # Over-fetch so members who left can be skipped without another query
+        batch = LEADERBOARD_PAGE_SIZE * 2
+        while True:
+            rows = await self.db.get_leaderboard_page(self.guild.id, batch, cursor)
+            for position, (user_id, total) in enumerate(rows, 1):
+                cursor = (total, user_id)
+                member = self.guild.get_member(user_id)
+                if member:
+                    entries.append((member, total))
+                    if len(entries) == LEADERBOARD_PAGE_SIZE:
+                        return entries, cursor, position < len(rows) or len(rows) == batch
+            
+            if len(rows) < batch:
+                return entries, cursor, False
+    
+    def prefetch_next(self):
+        """Start loading the page after the newest one while it is on screen"""
+        entries, cursor, has_more = self.pages[-1]
+        if has_more and self._prefetch is None:
+            self._prefetch = asyncio.create_task(self.fetch_page(cursor))
+    
+    def build_embed(self) -> discord.Embed:
+        """Render the current page"""
+        entries, _, _ = self.pages[self.index]
+        first_rank = self.index * LEADERBOARD_PAGE_SIZE + 1
+        
+        lines = []
+        for rank, (member, total) in enumerate(entries, first_rank):
+            prefix = ["🥇", "🥈", "🥉"][rank - 1] if rank <= 3 else f"**{rank}.**"
+            lines.append(f"{prefix} **{member.display_name}** - ${total:,}")
+        
+        embed = discord.Embed(
+            title=f"{Config.EMOJI_TROPHY} Economy Leaderboard",
+            description="\n".join(lines) if lines else "No users in the economy yet!",
+            color=Config.COLOR_PRIMARY
+        )
+        embed.set_footer(text=f"MegaBot Economy • Page {self.index + 1}")
+        
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.index == len(self.pages) - 1 and not self.pages[-1][2]
+        return embed
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message(
+                f"{Config.EMOJI_ERROR} Run `/leaderboard` yourself to browse pages!",
+                ephemeral=True
+            )
+            return False
+        return True
+    
+    @discord.ui.button(label="Previous", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.index -= 1
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+    
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.index == len(self.pages) - 1:
+            if self._prefetch is None:
+                self.prefetch_next()
+            prefetch, self._prefetch = self._prefetch, None
+            try:
+                page = await prefetch
+            except Exception as e:
+                logger.warning(f"Leaderboard prefetch failed, loading page directly: {e}")
+                try:
+                    page = await self.fetch_page(self.pages[-1][1])
+                except Exception as e:
+                    logger.error(f"Error loading leaderboard page: {e}")
+                    await interaction.response.send_message(
+                        f"{Config.EMOJI_ERROR} Couldn't load the next page, try again!",
+                        ephemeral=True
+                    )
+                    return
+            
+            if not page[0]:
+                # Everyone left on the remaining rows had left the server
+                self.pages[-1] = (*self.pages[-1][:2], False)
+                await interaction.response.edit_message(embed=self.build_embed(), view=self)
+                return
+            self.pages.append(page)
+        
+        self.index += 1
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+        self.prefetch_next()
+    
+    async def on_timeout(self):
+        if self._prefetch is not None:
+            self._prefetch.cancel()
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
 class Economy(commands.Cog):
     """Economy system with currency, gambling, and shop"""
     
     def __init__(self, bot):
         self.bot = bot
+        self.sweep_expired_boosts.start()
+        self.compact_rob_history.start()
+    
+    def cog_unload(self):
+        self.sweep_expired_boosts.cancel()
+        self.compact_rob_history.cancel()
     
     @app_commands.command(name="balance", description="Check your balance")
     async def balance(self, interaction: discord.Interaction):
         """Display user's balance"""
         guild_id = interaction.guild.id if interaction.guild else 0
-        balance = await self.bot.db.get_balance(interaction.user.id, guild_id)
-        
-        # Get active boosts
-        boosts = await self.bot.db.get_active_boosts(interaction.user.id, guild_id)
+        snapshot = await self.bot.db.get_user_snapshot(interaction.user.id, guild_id)
+        balance = snapshot['balance']
+        boosts = snapshot['boosts']
         
         embed = discord.Embed(
             title=f"{Config.EMOJI_MONEY} Balance",
@@ -36,9 +161,9 @@ class Economy(commands.Cog):
             for boost in boosts:
                 item_name = boost['item_name'].replace('_', ' ').title()
                 if boost['expiry_date']:
-                    remaining = boost['expiry_date'] - datetime.utcnow()
-                    hours = int(remaining.total_seconds() // 3600)
-                    minutes = int((remaining.total_seconds() % 3600) // 60)
+                    remaining = max(0, boost['expiry_date'] - int(time.time()))
+                    hours = remaining // 3600
+                    minutes = (remaining % 3600) // 60
                     time_str = f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
                     boost_list.append(f"✨ {item_name} ({time_str})")
                 else:
@@ -60,16 +185,15 @@ class Economy(commands.Cog):
         """Claim daily reward"""
         user_id = interaction.user.id
         guild_id = interaction.guild.id if interaction.guild else 0
-        now = datetime.utcnow()
+        now = int(time.time())
         
-        # Check cooldown
+        # Check cooldown (24 hours)
         last_daily = await self.bot.db.get_last_daily(user_id, guild_id)
         if last_daily:
-            time_diff = now - last_daily
-            if time_diff < timedelta(hours=24):
-                remaining = timedelta(hours=24) - time_diff
-                hours = int(remaining.total_seconds() // 3600)
-                minutes = int((remaining.total_seconds() % 3600) // 60)
+            remaining = last_daily + 86400 - now
+            if remaining > 0:
+                hours = remaining // 3600
+                minutes = (remaining % 3600) // 60
                 
                 embed = discord.Embed(
                     title=f"{Config.EMOJI_WARNING} Daily Cooldown",
@@ -89,8 +213,9 @@ class Economy(commands.Cog):
         
         # Apply boosts
         boost_text = ""
-        has_bank_upgrade = await self.bot.db.has_active_boost(user_id, guild_id, "daily_boost")
-        has_all_boost = await self.bot.db.has_active_boost(user_id, guild_id, "all_boost")
+        effects = await self.bot.db.get_boost_effects(user_id, guild_id)
+        has_bank_upgrade = "daily_boost" in effects
+        has_all_boost = "all_boost" in effects
         
         if has_all_boost:
             reward = int(reward * 3)
@@ -99,7 +224,7 @@ class Economy(commands.Cog):
             reward = int(reward * 1.5)
             boost_text = "\n🏦 **Bank Upgrade Active!** (+50%)"
         
-        new_balance = await self.bot.db.update_balance(user_id, reward, guild_id)
+        new_balance = await self.bot.db.adjust_balance(user_id, guild_id, reward)
         await self.bot.db.set_last_daily(user_id, guild_id)
         await self.bot.db.add_earned(user_id, reward, guild_id)
         
@@ -118,19 +243,19 @@ class Economy(commands.Cog):
         """Work to earn money"""
         user_id = interaction.user.id
         guild_id = interaction.guild.id if interaction.guild else 0
-        now = datetime.utcnow()
+        now = int(time.time())
         
         # Check for no cooldown boost
-        has_no_cooldown = await self.bot.db.has_active_boost(user_id, guild_id, "no_cooldown")
+        effects = await self.bot.db.get_boost_effects(user_id, guild_id)
+        has_no_cooldown = "no_cooldown" in effects
         
         if not has_no_cooldown:
             # Check cooldown (1 hour)
             last_work = await self.bot.db.get_last_work(user_id, guild_id)
             if last_work:
-                time_diff = now - last_work
-                if time_diff < timedelta(hours=1):
-                    remaining = timedelta(hours=1) - time_diff
-                    minutes = int(remaining.total_seconds() // 60)
+                remaining = last_work + 3600 - now
+                if remaining > 0:
+                    minutes = remaining // 60
                     
                     embed = discord.Embed(
                         title=f"{Config.EMOJI_WARNING} Work Cooldown",
@@ -158,8 +283,8 @@ class Economy(commands.Cog):
         
         # Apply boosts
         boost_text = ""
-        has_work_boost = await self.bot.db.has_active_boost(user_id, guild_id, "work_boost")
-        has_all_boost = await self.bot.db.has_active_boost(user_id, guild_id, "all_boost")
+        has_work_boost = "work_boost" in effects
+        has_all_boost = "all_boost" in effects
         
         if has_all_boost:
             earned *= 3
@@ -168,7 +293,7 @@ class Economy(commands.Cog):
             earned *= 2
             boost_text = "\n💼 **Briefcase Boost Active!** (2x)"
         
-        new_balance = await self.bot.db.update_balance(user_id, earned, guild_id)
+        new_balance = await self.bot.db.adjust_balance(user_id, guild_id, earned)
         await self.bot.db.set_last_work(user_id, guild_id)
         await self.bot.db.add_earned(user_id, earned, guild_id)
         
@@ -209,9 +334,10 @@ class Economy(commands.Cog):
             return
         
         # Check for better odds boost
-        has_better_odds = await self.bot.db.has_active_boost(user_id, guild_id, "better_odds")
-        has_gambling_boost = await self.bot.db.has_active_boost(user_id, guild_id, "gambling_boost")
-        has_all_boost = await self.bot.db.has_active_boost(user_id, guild_id, "all_boost")
+        effects = await self.bot.db.get_boost_effects(user_id, guild_id)
+        has_better_odds = "better_odds" in effects
+        has_gambling_boost = "gambling_boost" in effects
+        has_all_boost = "all_boost" in effects
         
         # Simple blackjack simulation with better odds for player if they have boost
         if has_better_odds:
@@ -249,7 +375,14 @@ class Economy(commands.Cog):
             winnings = -bet
             color = Config.COLOR_ERROR
         
-        new_balance = await self.bot.db.update_balance(user_id, winnings, guild_id)
+        # Losses can't take the balance below zero if it changed since the bet check
+        new_balance = await self.bot.db.adjust_balance(user_id, guild_id, winnings, floor=0)
+        if new_balance is None:
+            await interaction.response.send_message(
+                f"{Config.EMOJI_ERROR} You don't have enough money to cover that bet anymore!",
+                ephemeral=True
+            )
+            return
         if winnings > 0:
             await self.bot.db.add_earned(user_id, winnings, guild_id)
         
@@ -304,9 +437,10 @@ class Economy(commands.Cog):
             return
         
         # Check for boosts
-        has_better_odds = await self.bot.db.has_active_boost(user_id, guild_id, "better_odds")
-        has_gambling_boost = await self.bot.db.has_active_boost(user_id, guild_id, "gambling_boost")
-        has_all_boost = await self.bot.db.has_active_boost(user_id, guild_id, "all_boost")
+        effects = await self.bot.db.get_boost_effects(user_id, guild_id)
+        has_better_odds = "better_odds" in effects
+        has_gambling_boost = "gambling_boost" in effects
+        has_all_boost = "all_boost" in effects
         
         # Slot symbols
         symbols = ["🍒", "🍋", "🍊", "🍇", "💎", "7️⃣"]
@@ -351,7 +485,14 @@ class Economy(commands.Cog):
                 winnings = int(winnings * 2)
                 boost_text = "\n🍀 **Lucky Charm!** (2x)"
         
-        new_balance = await self.bot.db.update_balance(user_id, winnings, guild_id)
+        # Losses can't take the balance below zero if it changed since the bet check
+        new_balance = await self.bot.db.adjust_balance(user_id, guild_id, winnings, floor=0)
+        if new_balance is None:
+            await interaction.response.send_message(
+                f"{Config.EMOJI_ERROR} You don't have enough money to cover that bet anymore!",
+                ephemeral=True
+            )
+            return
         if winnings > 0:
             await self.bot.db.add_earned(user_id, winnings, guild_id)
         
@@ -415,9 +556,18 @@ class Economy(commands.Cog):
             )
             return
         
-        # Perform transfer
-        await self.bot.db.update_balance(interaction.user.id, -amount, guild_id)
-        await self.bot.db.update_balance(user.id, amount, guild_id)
+        # Perform transfer as one transaction so money is never created or lost
+        async with self.bot.db.transaction():
+            sender_balance = await self.bot.db.adjust_balance(interaction.user.id, guild_id, -amount, floor=0)
+            if sender_balance is not None:
+                await self.bot.db.adjust_balance(user.id, guild_id, amount)
+        
+        if sender_balance is None:
+            await interaction.response.send_message(
+                f"{Config.EMOJI_ERROR} You don't have enough money!",
+                ephemeral=True
+            )
+            return
         
         embed = discord.Embed(
             title=f"{Config.EMOJI_SUCCESS} Transfer Complete!",
@@ -431,33 +581,71 @@ class Economy(commands.Cog):
     @app_commands.command(name="leaderboard", description="View the richest users")
     async def leaderboard(self, interaction: discord.Interaction):
         """Display economy leaderboard"""
+        if not interaction.guild:
+            await interaction.response.send_message(f"{Config.EMOJI_ERROR} The leaderboard is only available in servers!", ephemeral=True)
+            return
+        
         await interaction.response.defer()
         
+        view = LeaderboardView(self.bot.db, interaction.guild, interaction.user.id)
+        view.pages.append(await view.fetch_page(None))
+        
+        view.message = await interaction.followup.send(embed=view.build_embed(), view=view, wait=True)
+        view.prefetch_next()
+    
+    @app_commands.command(name="rank", description="See where you stand on the leaderboard")
+    @app_commands.describe(user="User to check (leave empty for yourself)")
+    async def rank(self, interaction: discord.Interaction, user: Optional[discord.Member] = None):
+        """Display a user's leaderboard rank and neighbours"""
+        user = user or interaction.user
         guild_id = interaction.guild.id if interaction.guild else 0
         
-        # Get top users from database
-        leaderboard_data = await self.bot.db.get_leaderboard(10, guild_id)
+        standing = await self.bot.db.get_standing(user.id, guild_id)
+        if standing is None:
+            await interaction.response.send_message(
+                f"{Config.EMOJI_ERROR} {user.display_name} doesn't have an account yet!",
+                ephemeral=True
+            )
+            return
+        
+        rank = standing['rank']
+        accounts = standing['accounts']
+        # Share of accounts this user is ahead of
+        percentile = 100 * (accounts - rank) / accounts
         
         embed = discord.Embed(
-            title=f"{Config.EMOJI_TROPHY} Economy Leaderboard",
-            description="Top 10 Richest Users",
+            title=f"{Config.EMOJI_TROPHY} Rank",
+            description=f"**{user.display_name}** is **#{rank:,}** of {accounts:,} accounts",
             color=Config.COLOR_PRIMARY
         )
+        embed.add_field(name="💰 Net Worth", value=f"**${standing['total']:,}**", inline=True)
+        embed.add_field(name="📊 Percentile", value=f"Ahead of **{percentile:.1f}%**", inline=True)
         
-        if not leaderboard_data:
-            embed.description = "No users in the economy yet!"
-        else:
-            leaderboard_text = []
-            for i, (user_id, balance) in enumerate(leaderboard_data, 1):
-                user = interaction.guild.get_member(user_id) if interaction.guild else None
-                if user:
-                    emoji = ["🥇", "🥈", "🥉"][i-1] if i <= 3 else f"{i}️⃣"
-                    leaderboard_text.append(f"{emoji} **{user.display_name}** - ${balance:,}")
-            
-            embed.description = "\n".join(leaderboard_text) if leaderboard_text else "No users found!"
+        def describe(neighbour):
+            neighbour_id, total = neighbour
+            member = interaction.guild.get_member(neighbour_id) if interaction.guild else None
+            name = member.display_name if member else f"User {neighbour_id} (left)"
+            return f"**{name}** - ${total:,}"
         
-        embed.set_footer(text="MegaBot Economy")
-        await interaction.followup.send(embed=embed)
+        if standing['above']:
+            gap = standing['above'][1] - standing['total']
+            embed.add_field(
+                name=f"⬆️ #{rank - 1}",
+                value=f"{describe(standing['above'])}\n(${gap:,} ahead)",
+                inline=False
+            )
+        if standing['below']:
+            gap = standing['total'] - standing['below'][1]
+            embed.add_field(
+                name=f"⬇️ #{rank + 1}",
+                value=f"{describe(standing['below'])}\n(${gap:,} behind)",
+                inline=False
+            )
+        
+        embed.set_thumbnail(url=user.display_avatar.url)
+        # Ranking every account stays O(log n); /leaderboard filters members page by page
+        embed.set_footer(text="MegaBot Economy • Counts accounts of members who have left; /leaderboard lists current members only")
+        await interaction.response.send_message(embed=embed)
     
     @app_commands.command(name="inventory", description="View your inventory")
     async def inventory(self, interaction: discord.Interaction):
@@ -527,14 +715,13 @@ class Economy(commands.Cog):
             )
             return
         
-        # Check cooldown (2 hours)
+        # Read phase: cooldown, both balances and every relevant item in three queries
         last_rob = await self.bot.db.get_last_rob(robber_id, guild_id)
         if last_rob:
-            time_diff = datetime.utcnow() - last_rob
-            if time_diff < timedelta(hours=2):
-                remaining = timedelta(hours=2) - time_diff
-                hours = int(remaining.total_seconds() // 3600)
-                minutes = int((remaining.total_seconds() % 3600) // 60)
+            remaining = last_rob + 7200 - int(time.time())
+            if remaining > 0:
+                hours = remaining // 3600
+                minutes = (remaining % 3600) // 60
                 
                 embed = discord.Embed(
                     title=f"{Config.EMOJI_WARNING} Rob Cooldown",
@@ -545,9 +732,9 @@ class Economy(commands.Cog):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
         
-        # Get balances
-        robber_balance = await self.bot.db.get_balance(robber_id, guild_id)
-        victim_balance = await self.bot.db.get_balance(victim_id, guild_id)
+        balances = await self.bot.db.get_balances([robber_id, victim_id], guild_id)
+        robber_balance = balances[robber_id]
+        victim_balance = balances[victim_id]
         
         # Check minimum balance for robber
         if robber_balance < 500:
@@ -566,10 +753,16 @@ class Economy(commands.Cog):
             return
         
         # Check for security items
-        victim_padlock = await self.bot.db.get_item_quantity(victim_id, guild_id, "padlock")
-        victim_alarm = await self.bot.db.get_item_quantity(victim_id, guild_id, "alarm_system")
-        victim_guard_dog = await self.bot.db.get_item_quantity(victim_id, guild_id, "guard_dog")
-        robber_lockpick = await self.bot.db.get_item_quantity(robber_id, guild_id, "lockpick")
+        items = await self.bot.db.get_item_quantities(guild_id, [
+            (victim_id, "padlock"),
+            (victim_id, "alarm_system"),
+            (victim_id, "guard_dog"),
+            (robber_id, "lockpick")
+        ])
+        victim_padlock = items[(victim_id, "padlock")]
+        victim_alarm = items[(victim_id, "alarm_system")]
+        victim_guard_dog = items[(victim_id, "guard_dog")]
+        robber_lockpick = items[(robber_id, "lockpick")]
         
         # Base success rate: 50%
         success_rate = 50
@@ -598,19 +791,33 @@ class Economy(commands.Cog):
             stolen_amount = int(victim_balance * steal_percent)
             stolen_amount = min(stolen_amount, victim_balance)  # Can't steal more than they have
             
-            # Transfer money
-            await self.bot.db.update_balance(victim_id, -stolen_amount, guild_id)
-            await self.bot.db.update_balance(robber_id, stolen_amount, guild_id)
-            await self.bot.db.add_earned(robber_id, stolen_amount, guild_id)
-            
-            # Consume security items (they break after successful defense attempt... but rob succeeded)
             # Guard dog has a chance to counter-attack
             counter_attack = False
             if victim_guard_dog > 0 and random.randint(1, 100) <= 30:  # 30% counter-attack
                 counter_attack = True
                 counter_damage = random.randint(200, 500)
-                await self.bot.db.update_balance(robber_id, -counter_damage, guild_id)
-                await self.bot.db.use_inventory_item(victim_id, guild_id, "guard_dog", 1)
+            
+            # Write phase: apply every change in one transaction
+            async with self.bot.db.transaction():
+                # The floor catches a victim who spent their money since the read phase
+                victim_left = await self.bot.db.adjust_balance(victim_id, guild_id, -stolen_amount, floor=0)
+                if victim_left is not None:
+                    new_balance = await self.bot.db.adjust_balance(robber_id, guild_id, stolen_amount)
+                    await self.bot.db.add_earned(robber_id, stolen_amount, guild_id)
+                    
+                    # Consume security items (they break after successful defense attempt... but rob succeeded)
+                    if counter_attack:
+                        new_balance = await self.bot.db.adjust_balance(robber_id, guild_id, -counter_damage)
+                        await self.bot.db.use_inventory_item(victim_id, guild_id, "guard_dog", 1)
+                    
+                    await self.bot.db.add_rob_attempt(robber_id, victim_id, guild_id, stolen_amount, True)
+            
+            if victim_left is None:
+                await interaction.response.send_message(
+                    f"{Config.EMOJI_ERROR} {user.display_name} just spent their money! Try again.",
+                    ephemeral=True
+                )
+                return
             
             embed = discord.Embed(
                 title=f"💰 Rob Successful!",
@@ -627,21 +834,26 @@ class Economy(commands.Cog):
                     inline=False
                 )
             
-            new_balance = await self.bot.db.get_balance(robber_id, guild_id)
             embed.add_field(name="💰 Your New Balance", value=f"${new_balance:,}", inline=False)
             
         else:
             # Rob failed - robber loses money as fine
             fine = random.randint(300, 800)
-            await self.bot.db.update_balance(robber_id, -fine, guild_id)
             
             # Victim gets notified and may get compensation
             compensation = 0
             if victim_alarm > 0:
                 # Alarm triggers police - robber pays more, victim gets compensation
                 compensation = int(fine * 0.5)
-                await self.bot.db.update_balance(victim_id, compensation, guild_id)
-                await self.bot.db.use_inventory_item(victim_id, guild_id, "alarm_system", 1)
+            
+            # Write phase: apply every change in one transaction
+            async with self.bot.db.transaction():
+                new_balance = await self.bot.db.adjust_balance(robber_id, guild_id, -fine)
+                if compensation > 0:
+                    await self.bot.db.adjust_balance(victim_id, guild_id, compensation)
+                    await self.bot.db.use_inventory_item(victim_id, guild_id, "alarm_system", 1)
+                
+                await self.bot.db.add_rob_attempt(robber_id, victim_id, guild_id, 0, False)
             
             embed = discord.Embed(
                 title=f"🚨 Rob Failed!",
@@ -658,12 +870,8 @@ class Economy(commands.Cog):
                     inline=False
                 )
             
-            new_balance = await self.bot.db.get_balance(robber_id, guild_id)
             embed.add_field(name="💰 Your New Balance", value=f"${new_balance:,}", inline=False)
         
-        # Record attempt
-        await self.bot.db.add_rob_attempt(robber_id, victim_id, guild_id, stolen_amount if success else 0, success)
-        
         # Show security items that were active
         security_active = []
         if victim_padlock > 0:
@@ -755,7 +963,7 @@ class Economy(commands.Cog):
             return
         
         # Activate the boost
-        expiry_date = datetime.utcnow() + timedelta(seconds=item_data["duration"])
+        expiry_date = int(time.time()) + item_data["duration"]
         await self.bot.db.add_shop_item(user_id, guild_id, item_lower, item_data["effect"], expiry_date)
         
         hours = item_data["duration"] / 3600
@@ -828,7 +1036,7 @@ class Economy(commands.Cog):
             )
             return
         
-        new_balance = await self.bot.db.update_balance(user_id, sell_value, guild_id)
+        new_balance = await self.bot.db.adjust_balance(user_id, guild_id, sell_value)
         
         embed = discord.Embed(
             title=f"💵 Item Sold!",
@@ -1025,22 +1233,32 @@ class Economy(commands.Cog):
             )
             return
         
-        # Process purchase
-        await self.bot.db.update_balance(user_id, -price, guild_id)
-        
-        # Handle instant items
         bonus_text = ""
-        if item_data["type"] == "instant":
-            bonus = random.randint(800, 1200)
-            await self.bot.db.update_balance(user_id, bonus, guild_id)
-            await self.bot.db.add_earned(user_id, bonus, guild_id)
+        bonus = random.randint(800, 1200) if item_data["type"] == "instant" else 0
+        
+        # Process purchase in one transaction (fails if the balance dropped since the check above)
+        async with self.bot.db.transaction():
+            new_balance = await self.bot.db.adjust_balance(user_id, guild_id, -price, floor=0)
+            if new_balance is not None:
+                if bonus:
+                    # Handle instant items
+                    new_balance = await self.bot.db.adjust_balance(user_id, guild_id, bonus)
+                    await self.bot.db.add_earned(user_id, bonus, guild_id)
+                else:
+                    # Add to inventory
+                    await self.bot.db.add_inventory_item(user_id, guild_id, item_lower, item_data["type"], 1)
+        
+        if new_balance is None:
+            await interaction.response.send_message(
+                f"{Config.EMOJI_ERROR} Not enough money! You need ${price:,}",
+                ephemeral=True
+            )
+            return
+        
+        if bonus:
             bonus_text = f"\n\n💰 **Instant Gain:** You received ${bonus:,}!"
-        else:
-            # Add to inventory
-            await self.bot.db.add_inventory_item(user_id, guild_id, item_lower, item_data["type"], 1)
         
         # Build embed
-        new_balance = await self.bot.db.get_balance(user_id, guild_id)
         embed = discord.Embed(
             title=f"{Config.EMOJI_SUCCESS} Purchase Successful!",
             description=f"You bought **{item_data['emoji']} {item.title()}**!{bonus_text}",
@@ -1072,6 +1290,26 @@ class Economy(commands.Cog):
         embed.set_footer(text="MegaBot Shop • Check /inventory to see your items")
         
         await interaction.response.send_message(embed=embed)
+    
+    @tasks.loop(minutes=5)
+    async def sweep_expired_boosts(self):
+        """Delete expired boosts in the background so reads never have to"""
+        await self.bot.db.remove_expired_boosts()
+    
+    @sweep_expired_boosts.before_loop
+    async def before_sweep_expired_boosts(self):
+        await self.bot.wait_until_ready()
+    
+    @tasks.loop(hours=6)
+    async def compact_rob_history(self):
+        """Prune raw rob history past the retention window (totals are kept)"""
+        removed = await self.bot.db.compact_rob_history()
+        if removed:
+            logger.info(f"Compacted {removed} rob history rows")
+    
+    @compact_rob_history.before_loop
+    async def before_compact_rob_history(self):
+        await self.bot.wait_until_ready()
 
 async def setup(bot):
     await bot.add_cog(Economy(bot))
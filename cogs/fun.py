@@ -6,7 +6,7 @@ Provides entertainment commands like trivia, jokes, memes, etc.
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiohttp
+from config import Config
 import random
 from typing import Optional
 
@@ -21,22 +21,23 @@ class Fun(commands.Cog):
         await interaction.response.defer()
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get("https://official-joke-api.appspot.com/random_joke") as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        
-                        embed = discord.Embed(
-                            title="😄 Random Joke",
-                            description=data['setup'],
-                            color=discord.Color.gold()
-                        )
-                        embed.add_field(name="Punchline", value=f"||{data['punchline']}||")
-                        embed.set_footer(text="Click the spoiler to reveal!")
-                        
-                        await interaction.followup.send(embed=embed)
-                    else:
-                        await interaction.followup.send("❌ Couldn't fetch a joke!")
+            status, data = await self.bot.http_client.get_json(f"{Config.JOKE_API_URL}/random_joke")
+            if status == 429:
+                await interaction.followup.send("⏳ The joke API is rate limiting us, try again in a few seconds!")
+                return
+            if status != 200:
+                await interaction.followup.send("❌ Couldn't fetch a joke!")
+                return
+            
+            embed = discord.Embed(
+                title="😄 Random Joke",
+                description=data['setup'],
+                color=discord.Color.gold()
+            )
+            embed.add_field(name="Punchline", value=f"||{data['punchline']}||")
+            embed.set_footer(text="Click the spoiler to reveal!")
+            
+            await interaction.followup.send(embed=embed)
         except Exception as e:
             await interaction.followup.send(f"❌ Error: {str(e)}")
     
@@ -50,26 +51,26 @@ class Fun(commands.Cog):
             subreddits = ['memes', 'dankmemes', 'wholesomememes', 'me_irl']
             subreddit = random.choice(subreddits)
             
-            async with aiohttp.ClientSession() as session:
-                url = f"https://www.reddit.com/r/{subreddit}/random.json"
-                headers = {'User-Agent': 'Discord Bot'}
-                
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        
-                        post = data[0]['data']['children'][0]['data']
-                        
-                        embed = discord.Embed(
-                            title=post['title'],
-                            color=discord.Color.orange()
-                        )
-                        embed.set_image(url=post['url'])
-                        embed.set_footer(text=f"👍 {post['ups']} upvotes | r/{subreddit}")
-                        
-                        await interaction.followup.send(embed=embed)
-                    else:
-                        await interaction.followup.send("❌ Couldn't fetch a meme!")
+            url = f"{Config.REDDIT_API_URL}/r/{subreddit}/random.json"
+            headers = {'User-Agent': 'Discord Bot'}
+            status, data = await self.bot.http_client.get_json(url, headers=headers)
+            if status == 429:
+                await interaction.followup.send("⏳ Reddit is rate limiting us, try again in a few seconds!")
+                return
+            if status != 200:
+                await interaction.followup.send("❌ Couldn't fetch a meme!")
+                return
+            
+            post = data[0]['data']['children'][0]['data']
+            
+            embed = discord.Embed(
+                title=post['title'],
+                color=discord.Color.orange()
+            )
+            embed.set_image(url=post['url'])
+            embed.set_footer(text=f"👍 {post['ups']} upvotes | r/{subreddit}")
+            
+            await interaction.followup.send(embed=embed)
         except Exception as e:
             await interaction.followup.send(f"❌ Error fetching meme: {str(e)}")
     
@@ -137,74 +138,78 @@ class Fun(commands.Cog):
         category_id = categories.get(category.lower(), 9)
         
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"https://opentdb.com/api.php?amount=1&category={category_id}&difficulty={difficulty.lower()}&type=multiple"
+            url = f"{Config.OPENTDB_API_URL}/api.php?amount=1&category={category_id}&difficulty={difficulty.lower()}&type=multiple"
+            status, data = await self.bot.http_client.get_json(url)
+            if status == 429:
+                await interaction.followup.send("⏳ The trivia API is rate limiting us, try again in a few seconds!")
+                return
+            if status != 200:
+                await interaction.followup.send("❌ Error fetching trivia question!")
+                return
+            
+            if data['response_code'] == 5:
+                # OpenTDB reports its rate limit in the body, with a 200
+                await interaction.followup.send("⏳ The trivia API is rate limiting us, try again in a few seconds!")
+                return
+            if data['response_code'] != 0:
+                await interaction.followup.send("❌ No trivia questions available!")
+                return
+            
+            question_data = data['results'][0]
+            question = question_data['question']
+            correct_answer = question_data['correct_answer']
+            all_answers = question_data['incorrect_answers'] + [correct_answer]
+            random.shuffle(all_answers)
+            
+            # Format with emojis
+            emojis = ['🅰️', '🅱️', '©️', '🅳']
+            options = "\n".join([f"{emojis[i]} {ans}" for i, ans in enumerate(all_answers)])
+            
+            embed = discord.Embed(
+                title=f"🎯 Trivia - {category.title()} ({difficulty.title()})",
+                description=f"**{question}**\n\n{options}",
+                color=discord.Color.blue()
+            )
+            embed.set_footer(text="You have 30 seconds to answer! Type A, B, C, or D")
+            
+            await interaction.followup.send(embed=embed)
+            
+            # Store correct answer
+            correct_letter = ['A', 'B', 'C', 'D'][all_answers.index(correct_answer)]
+            
+            def check(m):
+                return (m.author.id == interaction.user.id and 
+                       m.channel.id == interaction.channel.id and 
+                       m.content.upper() in ['A', 'B', 'C', 'D'])
+            
+            try:
+                msg = await self.bot.wait_for('message', timeout=30.0, check=check)
+                
+                if msg.content.upper() == correct_letter:
+                    embed = discord.Embed(
+                        title="✅ Correct!",
+                        description=f"The answer is **{correct_letter}: {correct_answer}**",
+                        color=discord.Color.green()
+                    )
+                    embed.set_footer(text="🎉 Great job!")
+                else:
+                    user_answer_idx = ord(msg.content.upper()) - ord('A')
+                    embed = discord.Embed(
+                        title="❌ Incorrect!",
+                        description=f"You answered: **{msg.content.upper()}: {all_answers[user_answer_idx]}**\n\nCorrect answer: **{correct_letter}: {correct_answer}**",
+                        color=discord.Color.red()
+                    )
+                    embed.set_footer(text="Better luck next time!")
                 
-                async with session.get(url) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        
-                        if data['response_code'] != 0:
-                            await interaction.followup.send("❌ No trivia questions available!")
-                            return
-                        
-                        question_data = data['results'][0]
-                        question = question_data['question']
-                        correct_answer = question_data['correct_answer']
-                        all_answers = question_data['incorrect_answers'] + [correct_answer]
-                        random.shuffle(all_answers)
-                        
-                        # Format with emojis
-                        emojis = ['🅰️', '🅱️', '©️', '🅳']
-                        options = "\n".join([f"{emojis[i]} {ans}" for i, ans in enumerate(all_answers)])
-                        
-                        embed = discord.Embed(
-                            title=f"🎯 Trivia - {category.title()} ({difficulty.title()})",
-                            description=f"**{question}**\n\n{options}",
-                            color=discord.Color.blue()
-                        )
-                        embed.set_footer(text="You have 30 seconds to answer! Type A, B, C, or D")
-                        
-                        await interaction.followup.send(embed=embed)
-                        
-                        # Store correct answer
-                        correct_letter = ['A', 'B', 'C', 'D'][all_answers.index(correct_answer)]
-                        
-                        def check(m):
-                            return (m.author.id == interaction.user.id and 
-                                   m.channel.id == interaction.channel.id and 
-                                   m.content.upper() in ['A', 'B', 'C', 'D'])
-                        
-                        try:
-                            msg = await self.bot.wait_for('message', timeout=30.0, check=check)
-                            
-                            if msg.content.upper() == correct_letter:
-                                embed = discord.Embed(
-                                    title="✅ Correct!",
-                                    description=f"The answer is **{correct_letter}: {correct_answer}**",
-                                    color=discord.Color.green()
-                                )
-                                embed.set_footer(text="🎉 Great job!")
-                            else:
-                                user_answer_idx = ord(msg.content.upper()) - ord('A')
-                                embed = discord.Embed(
-                                    title="❌ Incorrect!",
-                                    description=f"You answered: **{msg.content.upper()}: {all_answers[user_answer_idx]}**\n\nCorrect answer: **{correct_letter}: {correct_answer}**",
-                                    color=discord.Color.red()
-                                )
-                                embed.set_footer(text="Better luck next time!")
-                            
-                            await interaction.channel.send(embed=embed)
-                            
-                        except Exception:
-                            embed = discord.Embed(
-                                title="⏰ Time's Up!",
-                                description=f"The correct answer was **{correct_letter}: {correct_answer}**",
-                                color=discord.Color.orange()
-                            )
-                            await interaction.channel.send(embed=embed)
-                    else:
-                        await interaction.followup.send("❌ Error fetching trivia question!")
+                await interaction.channel.send(embed=embed)
+            
+            except Exception:
+                embed = discord.Embed(
+                    title="⏰ Time's Up!",
+                    description=f"The correct answer was **{correct_letter}: {correct_answer}**",
+                    color=discord.Color.orange()
+                )
+                await interaction.channel.send(embed=embed)
         except Exception as e:
             await interaction.followup.send(f"❌ Error: {str(e)}")
     
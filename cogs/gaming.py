@@ -1,17 +1,76 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiohttp
 from config import Config
+from utils.cache import TTLCache
+import asyncio
 import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
 
 logger = logging.getLogger('MegaBot.Gaming')
 
+@dataclass
+class SteamProfile:
+    """A Steam account as shown by /steam"""
+    steam_id: str
+    name: str
+    profile_url: str
+    avatar_url: Optional[str]
+    state: int
+    created: Optional[int]
+    country: Optional[str]
+    current_game: Optional[str]
+    visibility: Optional[int]
+    # False when the library is private, empty or couldn't be fetched in time
+    games_visible: bool = False
+    game_count: int = 0
+    total_minutes: int = 0
+    top_games: List[Tuple[str, int]] = field(default_factory=list)  # (name, minutes played)
+    
+    @classmethod
+    def from_api(cls, steam_id: str, summary: dict, games: Optional[dict]) -> 'SteamProfile':
+        """Build a profile from GetPlayerSummaries and GetOwnedGames responses"""
+        profile = cls(
+            steam_id=steam_id,
+            name=summary.get('personaname', 'Steam User'),
+            profile_url=summary.get('profileurl', ''),
+            avatar_url=summary.get('avatarfull'),
+            state=summary.get('personastate', 0),
+            created=summary.get('timecreated'),
+            country=summary.get('loccountrycode'),
+            current_game=summary.get('gameextrainfo'),
+            visibility=summary.get('communityvisibilitystate')
+        )
+        if games:
+            owned = games.get('games', [])
+            profile.games_visible = True
+            profile.game_count = games.get('game_count', 0)
+            profile.total_minutes = sum(game.get('playtime_forever', 0) for game in owned)
+            top_games = sorted(owned, key=lambda x: x.get('playtime_forever', 0), reverse=True)[:5]
+            profile.top_games = [
+                (game.get('name', 'Unknown Game'), game.get('playtime_forever', 0))
+                for game in top_games
+            ]
+        return profile
+
 class Gaming(commands.Cog):
     """Gaming-related commands including Steam integration"""
     
     def __init__(self, bot):
         self.bot = bot
+        # Steam responses; stale entries are served while a background refresh runs
+        self._summaries = TTLCache(Config.STEAM_SUMMARY_TTL, Config.STEAM_STALE_TTL, Config.STEAM_CACHE_SIZE)
+        self._owned_games = TTLCache(Config.STEAM_GAMES_TTL, Config.STEAM_STALE_TTL, Config.STEAM_CACHE_SIZE)
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+    
+    def cog_unload(self):
+        for task in self._refreshing.values():
+            task.cancel()
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/stale/miss counters for the Steam caches"""
+        return {'summaries': self._summaries.stats(), 'owned_games': self._owned_games.stats()}
     
     @app_commands.command(name="steam", description="View Steam profile information")
     @app_commands.describe(username="Steam username or Steam ID (64-bit Steam ID)")
@@ -28,12 +87,16 @@ class Gaming(commands.Cog):
             await interaction.followup.send(embed=embed)
             return
         
+        # Every Steam call for this command shares one deadline
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + Config.STEAM_DEADLINE
+        
         try:
             # Determine if input is Steam ID or vanity URL
             steam_id = username
             if not username.isdigit() or len(username) != 17:
                 # Try to resolve vanity URL to Steam ID
-                steam_id = await self._resolve_vanity_url(username)
+                steam_id = await asyncio.wait_for(self._resolve_vanity_url(username), deadline - loop.time())
                 if not steam_id:
                     embed = discord.Embed(
                         title=f"{Config.EMOJI_ERROR} User Not Found",
@@ -43,9 +106,9 @@ class Gaming(commands.Cog):
                     await interaction.followup.send(embed=embed)
                     return
             
-            # Get player summary
-            player_data = await self._get_player_summary(steam_id)
-            if not player_data:
+            # Summary and library are fetched together under the same deadline
+            profile = await self._fetch_profile(steam_id, deadline)
+            if profile is None:
                 embed = discord.Embed(
                     title=f"{Config.EMOJI_ERROR} Profile Not Found",
                     description="Could not retrieve profile data. The profile might be private.",
@@ -54,94 +117,15 @@ class Gaming(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            # Get owned games
-            games_data = await self._get_owned_games(steam_id)
+            await interaction.followup.send(embed=self._build_profile_embed(profile))
             
-            # Create embed
+        except asyncio.TimeoutError:
             embed = discord.Embed(
-                title=f"🎮 {player_data.get('personaname', 'Steam User')}",
-                url=player_data.get('profileurl', ''),
-                color=Config.COLOR_PRIMARY
+                title=f"{Config.EMOJI_ERROR} Steam Timed Out",
+                description="Steam took too long to respond. Try again in a moment!",
+                color=Config.COLOR_ERROR
             )
-            
-            # Set thumbnail to avatar
-            if 'avatarfull' in player_data:
-                embed.set_thumbnail(url=player_data['avatarfull'])
-            
-            # Status
-            status_map = {
-                0: "🔴 Offline",
-                1: "🟢 Online",
-                2: "🔵 Busy",
-                3: "🟡 Away",
-                4: "💤 Snooze",
-                5: "🔍 Looking to Trade",
-                6: "🎮 Looking to Play"
-            }
-            status = status_map.get(player_data.get('personastate', 0), "❓ Unknown")
-            embed.add_field(name="Status", value=status, inline=True)
-            
-            # Account creation
-            if 'timecreated' in player_data:
-                created = player_data['timecreated']
-                embed.add_field(name="Member Since", value=f"<t:{created}:D>", inline=True)
-            
-            # Country
-            if 'loccountrycode' in player_data:
-                embed.add_field(name="Country", value=f":flag_{player_data['loccountrycode'].lower()}:", inline=True)
-            
-            # Games info
-            if games_data:
-                game_count = games_data.get('game_count', 0)
-                total_playtime = sum(game.get('playtime_forever', 0) for game in games_data.get('games', []))
-                total_hours = total_playtime // 60
-                
-                embed.add_field(name="🎮 Games Owned", value=f"{game_count:,}", inline=True)
-                embed.add_field(name="⏱️ Total Playtime", value=f"{total_hours:,} hours", inline=True)
-                
-                # Top 5 most played games
-                if games_data.get('games'):
-                    top_games = sorted(games_data['games'], key=lambda x: x.get('playtime_forever', 0), reverse=True)[:5]
-                    games_list = []
-                    for game in top_games:
-                        name = game.get('name', 'Unknown Game')
-                        hours = game.get('playtime_forever', 0) // 60
-                        games_list.append(f"**{name}** - {hours:,} hrs")
-                    
-                    if games_list:
-                        embed.add_field(
-                            name="🏆 Top Games",
-                            value="\n".join(games_list),
-                            inline=False
-                        )
-            else:
-                embed.add_field(
-                    name="🔒 Game Library",
-                    value="Private or no games found",
-                    inline=False
-                )
-            
-            # Currently playing
-            if 'gameextrainfo' in player_data:
-                embed.add_field(
-                    name="🎮 Currently Playing",
-                    value=f"**{player_data['gameextrainfo']}**",
-                    inline=False
-                )
-            
-            # Profile visibility
-            visibility_map = {
-                1: "🔒 Private",
-                3: "🌐 Public"
-            }
-            if 'communityvisibilitystate' in player_data:
-                visibility = visibility_map.get(player_data['communityvisibilitystate'], "❓ Unknown")
-                embed.set_footer(text=f"Profile: {visibility} • Steam ID: {steam_id}")
-            else:
-                embed.set_footer(text=f"Steam ID: {steam_id}")
-            
             await interaction.followup.send(embed=embed)
-            
         except Exception as e:
             logger.error(f"Error fetching Steam profile: {e}", exc_info=True)
             embed = discord.Embed(
@@ -151,42 +135,182 @@ class Gaming(commands.Cog):
             )
             await interaction.followup.send(embed=embed)
     
+    async def _fetch_profile(self, steam_id: str, deadline: float) -> Optional[SteamProfile]:
+        """Fetch summary and owned games concurrently, giving up at the loop-time deadline.
+        
+        The profile is None if the summary doesn't exist. A summary that misses
+        the deadline raises asyncio.TimeoutError; a library that misses it or
+        fails is just left out of the profile.
+        """
+        loop = asyncio.get_running_loop()
+        
+        async def until_deadline(call: Awaitable[Any]) -> Any:
+            return await asyncio.wait_for(call, deadline - loop.time())
+        
+        summary, games = await asyncio.gather(
+            until_deadline(self._get_player_summary(steam_id)),
+            until_deadline(self._get_owned_games(steam_id)),
+            return_exceptions=True
+        )
+        if isinstance(summary, BaseException):
+            raise summary
+        if isinstance(games, BaseException):
+            logger.warning(f"Owned games for {steam_id} unavailable: {games!r}")
+            games = None
+        
+        if not summary:
+            return None
+        return SteamProfile.from_api(steam_id, summary, games)
+    
+    def _build_profile_embed(self, profile: SteamProfile) -> discord.Embed:
+        """Render a Steam profile"""
+        embed = discord.Embed(
+            title=f"🎮 {profile.name}",
+            url=profile.profile_url,
+            color=Config.COLOR_PRIMARY
+        )
+        
+        # Set thumbnail to avatar
+        if profile.avatar_url:
+            embed.set_thumbnail(url=profile.avatar_url)
+        
+        # Status
+        status_map = {
+            0: "🔴 Offline",
+            1: "🟢 Online",
+            2: "🔵 Busy",
+            3: "🟡 Away",
+            4: "💤 Snooze",
+            5: "🔍 Looking to Trade",
+            6: "🎮 Looking to Play"
+        }
+        status = status_map.get(profile.state, "❓ Unknown")
+        embed.add_field(name="Status", value=status, inline=True)
+        
+        # Account creation
+        if profile.created:
+            embed.add_field(name="Member Since", value=f"<t:{profile.created}:D>", inline=True)
+        
+        # Country
+        if profile.country:
+            embed.add_field(name="Country", value=f":flag_{profile.country.lower()}:", inline=True)
+        
+        # Games info
+        if profile.games_visible:
+            embed.add_field(name="🎮 Games Owned", value=f"{profile.game_count:,}", inline=True)
+            embed.add_field(name="⏱️ Total Playtime", value=f"{profile.total_minutes // 60:,} hours", inline=True)
+            
+            # Top 5 most played games
+            if profile.top_games:
+                games_list = [f"**{name}** - {minutes // 60:,} hrs" for name, minutes in profile.top_games]
+                embed.add_field(
+                    name="🏆 Top Games",
+                    value="\n".join(games_list),
+                    inline=False
+                )
+        else:
+            embed.add_field(
+                name="🔒 Game Library",
+                value="Private or no games found",
+                inline=False
+            )
+        
+        # Currently playing
+        if profile.current_game:
+            embed.add_field(
+                name="🎮 Currently Playing",
+                value=f"**{profile.current_game}**",
+                inline=False
+            )
+        
+        # Profile visibility
+        visibility_map = {
+            1: "🔒 Private",
+            3: "🌐 Public"
+        }
+        if profile.visibility is not None:
+            visibility = visibility_map.get(profile.visibility, "❓ Unknown")
+            embed.set_footer(text=f"Profile: {visibility} • Steam ID: {profile.steam_id}")
+        else:
+            embed.set_footer(text=f"Steam ID: {profile.steam_id}")
+        
+        return embed
+    
+    async def _cached(self, cache: TTLCache, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Read through a cache, refreshing stale entries in the background"""
+        entry = cache.get(key)
+        if entry is None:
+            value = await fetch()
+            if value is not None:
+                cache.put(key, value)
+            return value
+        
+        value, fresh = entry
+        if not fresh and key not in self._refreshing:
+            self._refreshing[key] = asyncio.create_task(self._refresh(cache, key, fetch))
+        return value
+    
+    async def _refresh(self, cache: TTLCache, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        """Replace a stale cache entry; on failure the stale value keeps being served"""
+        try:
+            value = await fetch()
+            if value is not None:
+                cache.put(key, value)
+        except Exception as e:
+            logger.warning(f"Background refresh of {key} failed: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+    
     async def _resolve_vanity_url(self, vanity_name: str) -> str:
+        """Convert vanity URL to Steam ID, remembering the answer in the database"""
+        steam_id = await self.bot.db.get_steam_id(vanity_name)
+        if steam_id:
+            return steam_id
+        
+        steam_id = await self._fetch_vanity_url(vanity_name)
+        if steam_id:
+            await self.bot.db.set_steam_id(vanity_name, steam_id)
+        return steam_id
+    
+    async def _get_player_summary(self, steam_id: str) -> dict:
+        """Get player summary, cached for STEAM_SUMMARY_TTL seconds"""
+        return await self._cached(self._summaries, steam_id, lambda: self._fetch_player_summary(steam_id))
+    
+    async def _get_owned_games(self, steam_id: str) -> dict:
+        """Get owned games, cached for STEAM_GAMES_TTL seconds"""
+        return await self._cached(self._owned_games, steam_id, lambda: self._fetch_owned_games(steam_id))
+    
+    async def _fetch_vanity_url(self, vanity_name: str) -> str:
         """Convert vanity URL to Steam ID"""
-        url = f"https://api.steampowered.com/ISteamUser/ResolveVanityURL/v1/"
+        url = f"{Config.STEAM_API_URL}/ISteamUser/ResolveVanityURL/v1/"
         params = {
             'key': Config.STEAM_API_KEY,
             'vanityurl': vanity_name
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('response', {}).get('success') == 1:
-                        return data['response']['steamid']
+        status, data = await self.bot.http_client.get_json(url, params=params, coalesce=True)
+        if status == 200 and data.get('response', {}).get('success') == 1:
+            return data['response']['steamid']
         return None
     
-    async def _get_player_summary(self, steam_id: str) -> dict:
+    async def _fetch_player_summary(self, steam_id: str) -> dict:
         """Get player summary from Steam API"""
-        url = f"https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2/"
+        url = f"{Config.STEAM_API_URL}/ISteamUser/GetPlayerSummaries/v2/"
         params = {
             'key': Config.STEAM_API_KEY,
             'steamids': steam_id
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    players = data.get('response', {}).get('players', [])
-                    if players:
-                        return players[0]
+        status, data = await self.bot.http_client.get_json(url, params=params, coalesce=True)
+        if status == 200:
+            players = data.get('response', {}).get('players', [])
+            if players:
+                return players[0]
         return None
     
-    async def _get_owned_games(self, steam_id: str) -> dict:
+    async def _fetch_owned_games(self, steam_id: str) -> dict:
         """Get owned games from Steam API"""
-        url = f"https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
+        url = f"{Config.STEAM_API_URL}/IPlayerService/GetOwnedGames/v1/"
         params = {
             'key': Config.STEAM_API_KEY,
             'steamid': steam_id,
@@ -194,11 +318,9 @@ class Gaming(commands.Cog):
             'include_played_free_games': 1
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get('response', {})
+        status, data = await self.bot.http_client.get_json(url, params=params, coalesce=True)
+        if status == 200:
+            return data.get('response', {})
         return None
     
     @app_commands.command(name="playing", description="See what server members are currently playing")
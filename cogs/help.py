@@ -94,6 +94,7 @@ class Help(commands.Cog):
                         "/work - Work to earn money",
                         "/transfer <user> <amount> - Transfer money to another user",
                         "/leaderboard - View the richest users on the server",
+                        "/rank [user] - See your leaderboard rank and neighbours",
                         "/shop - View items available in the shop",
                         "/buy <item> - Buy an item from the shop",
                         "/inventory - View your items and boosts",
@@ -421,8 +421,8 @@ class Moderation(commands.Cog):
             return
         
         # Save warning to database
-        await self.bot.db.add_warning(member.id, interaction.user.id, reason)
-        warning_count = await self.bot.db.get_warning_count(member.id)
+        await self.bot.db.add_warning(member.id, interaction.user.id, reason, interaction.guild.id)
+        warning_count = await self.bot.db.get_warning_count(member.id, interaction.guild.id)
         
         # Public warning embed
         embed = discord.Embed(
@@ -6,7 +6,7 @@ Provides useful utility commands like polls, reminders, weather, etc.
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
-import aiohttp
+from config import Config
 from datetime import datetime, timedelta
 import asyncio
 from typing import Optional
@@ -88,7 +88,10 @@ class Utility(commands.Cog):
         due_reminders = await self.bot.db.get_due_reminders()
         
         for reminder in due_reminders:
-            reminder_id, user_id, channel_id, message = reminder
+            reminder_id = reminder['id']
+            user_id = reminder['user_id']
+            channel_id = reminder['channel_id']
+            message = reminder['message']
             try:
                 channel = self.bot.get_channel(channel_id)
                 user = self.bot.get_user(user_id)
@@ -102,11 +105,11 @@ class Utility(commands.Cog):
                     await channel.send(embed=embed)
                 
                 # Remove sent reminder from database
-                await self.bot.db.remove_reminder(reminder_id)
+                await self.bot.db.delete_reminder(reminder_id)
             except Exception as e:
                 print(f"Error sending reminder: {e}")
                 # Remove failed reminder from database
-                await self.bot.db.remove_reminder(reminder_id)
+                await self.bot.db.delete_reminder(reminder_id)
     
     @check_reminders.before_loop
     async def before_check_reminders(self):
@@ -123,30 +126,31 @@ class Utility(commands.Cog):
         
         try:
             # Using LibreTranslate (free, open source)
-            async with aiohttp.ClientSession() as session:
-                url = "https://libretranslate.com/translate"
-                data = {
-                    'q': text,
-                    'source': 'auto',
-                    'target': target_language.lower(),
-                    'format': 'text'
-                }
-                
-                async with session.post(url, json=data) as resp:
-                    if resp.status == 200:
-                        result = await resp.json()
-                        translated = result['translatedText']
-                        
-                        embed = discord.Embed(
-                            title="🌍 Translation",
-                            color=discord.Color.blue()
-                        )
-                        embed.add_field(name="Original", value=text, inline=False)
-                        embed.add_field(name=f"Translated ({target_language.upper()})", value=translated, inline=False)
-                        
-                        await interaction.followup.send(embed=embed)
-                    else:
-                        await interaction.followup.send("❌ Translation failed. Check language code!")
+            url = f"{Config.TRANSLATE_API_URL}/translate"
+            data = {
+                'q': text,
+                'source': 'auto',
+                'target': target_language.lower(),
+                'format': 'text'
+            }
+            status, result = await self.bot.http_client.post_json(url, json=data)
+            if status == 429:
+                await interaction.followup.send("⏳ The translation API is rate limiting us, try again in a few seconds!")
+                return
+            if status != 200:
+                await interaction.followup.send("❌ Translation failed. Check language code!")
+                return
+            
+            translated = result['translatedText']
+            
+            embed = discord.Embed(
+                title="🌍 Translation",
+                color=discord.Color.blue()
+            )
+            embed.add_field(name="Original", value=text, inline=False)
+            embed.add_field(name=f"Translated ({target_language.upper()})", value=translated, inline=False)
+            
+            await interaction.followup.send(embed=embed)
         except Exception as e:
             await interaction.followup.send(f"❌ Error: {str(e)}")
     
@@ -25,12 +25,67 @@ class Config:
     
     # Database
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///data/database.db')
+    LEGACY_DATABASE_PATH = os.getenv('LEGACY_DATABASE_PATH', 'bot_data.db')  # Imported once, then unused
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 4))  # Reader connections kept open
+    BALANCE_CACHE_SIZE = int(os.getenv('BALANCE_CACHE_SIZE', 10000))  # Balances kept in memory
+    BOOST_CACHE_SIZE = int(os.getenv('BOOST_CACHE_SIZE', 10000))  # Users' boost effects kept in memory
+    DB_GROUP_COMMIT = os.getenv('DB_GROUP_COMMIT', 'False') == 'True'  # Batch balance writes into shared commits
+    DB_GROUP_COMMIT_WINDOW_MS = int(os.getenv('DB_GROUP_COMMIT_WINDOW_MS', 5))  # Max wait before a batch commits
+    DB_GROUP_COMMIT_MAX_BATCH = int(os.getenv('DB_GROUP_COMMIT_MAX_BATCH', 64))  # Commit early once this many writes queue up
+    DB_JOURNAL_MODE = os.getenv('DB_JOURNAL_MODE', 'WAL')
+    DB_SYNCHRONOUS = os.getenv('DB_SYNCHRONOUS', 'NORMAL')
+    DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', 64 * 1024 * 1024))  # Bytes
+    DB_CACHE_SIZE = int(os.getenv('DB_CACHE_SIZE', -16000))  # Pages, or KiB if negative
+    DB_TEMP_STORE = os.getenv('DB_TEMP_STORE', 'MEMORY')
+    DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', 5000))
+    DB_CHECKPOINT_INTERVAL = int(os.getenv('DB_CHECKPOINT_INTERVAL', 300))  # Seconds between WAL checkpoints
+    BACKUP_DIR = os.getenv('BACKUP_DIR', 'data/backups')
+    BACKUP_KEEP = int(os.getenv('BACKUP_KEEP', 7))  # Newest backups kept; older ones are deleted
+    BACKUP_INTERVAL_HOURS = int(os.getenv('BACKUP_INTERVAL_HOURS', 24))  # 0 disables scheduled backups
+    BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', 1024))  # Pages copied per backup step (WAL databases copy in one step)
+    API_TOKEN = os.getenv('API_TOKEN', '')  # Bearer token for POST endpoints; unset disables them
+    
+    # HTTP Client
+    HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 10))  # Seconds for a whole request
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+    HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', 100))  # Open connections across all hosts
+    HTTP_LIMIT_PER_HOST = int(os.getenv('HTTP_LIMIT_PER_HOST', 10))
+    HTTP_DNS_CACHE_TTL = int(os.getenv('HTTP_DNS_CACHE_TTL', 300))  # Seconds
+    HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', 30))  # Idle seconds before a pooled connection closes
+    HTTP_USER_AGENT = os.getenv('HTTP_USER_AGENT', 'Discord Bot')
+    HTTP_HOST_RATES = os.getenv(
+        'HTTP_HOST_RATES',
+        'api.steampowered.com=1.5:5,opentdb.com=0.2:1,www.reddit.com=0.15:3,'
+        'official-joke-api.appspot.com=2:5,libretranslate.com=0.3:2'
+    )  # host=requests per second:burst, comma separated
+    HTTP_DEFAULT_RATE = float(os.getenv('HTTP_DEFAULT_RATE', 5))  # For hosts not listed above; 0 disables pacing
+    HTTP_DEFAULT_BURST = int(os.getenv('HTTP_DEFAULT_BURST', 10))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+    HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', 0.5))  # Seconds; doubled per attempt, then jittered
+    HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', 30))
+    HTTP_RETRY_AFTER_MAX = float(os.getenv('HTTP_RETRY_AFTER_MAX', 60))  # Longer Retry-After values fail instead of waiting
+    
+    # External API base URLs (point these at tools/stub_server.py to run offline)
+    STEAM_API_URL = os.getenv('STEAM_API_URL', 'https://api.steampowered.com')
+    OPENTDB_API_URL = os.getenv('OPENTDB_API_URL', 'https://opentdb.com')
+    REDDIT_API_URL = os.getenv('REDDIT_API_URL', 'https://www.reddit.com')
+    JOKE_API_URL = os.getenv('JOKE_API_URL', 'https://official-joke-api.appspot.com')
+    TRANSLATE_API_URL = os.getenv('TRANSLATE_API_URL', 'https://libretranslate.com')
+    
+    # Steam Cache
+    STEAM_SUMMARY_TTL = int(os.getenv('STEAM_SUMMARY_TTL', 300))  # Seconds a player summary is fresh
+    STEAM_GAMES_TTL = int(os.getenv('STEAM_GAMES_TTL', 3600))  # Seconds an owned-games list is fresh
+    STEAM_STALE_TTL = int(os.getenv('STEAM_STALE_TTL', 86400))  # Seconds past its TTL an entry is still served while it refreshes
+    STEAM_VANITY_TTL = int(os.getenv('STEAM_VANITY_TTL', 30 * 86400))  # Seconds before a stored vanity URL is resolved again
+    STEAM_CACHE_SIZE = int(os.getenv('STEAM_CACHE_SIZE', 1000))  # Profiles kept per cache
+    STEAM_DEADLINE = float(os.getenv('STEAM_DEADLINE', 8))  # Seconds /steam waits for all of its Steam calls
     
     # Economy Settings
     STARTING_BALANCE = int(os.getenv('STARTING_BALANCE', 1000))
     DAILY_REWARD = int(os.getenv('DAILY_REWARD', 100))
     WORK_REWARD_MIN = int(os.getenv('WORK_REWARD_MIN', 50))
     WORK_REWARD_MAX = int(os.getenv('WORK_REWARD_MAX', 200))
+    ROB_HISTORY_RETENTION_DAYS = int(os.getenv('ROB_HISTORY_RETENTION_DAYS', 30))  # Raw rob rows kept; totals live in rob_stats
     
     # Study Settings
     DEFAULT_STUDY_DURATION = int(os.getenv('DEFAULT_STUDY_DURATION', 25))
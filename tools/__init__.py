@@ -0,0 +1,2 @@
+# Tools Package
+# Offline development helpers: API stub server and benchmarks
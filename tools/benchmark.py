@@ -0,0 +1,261 @@
+"""
+Offline benchmark for the gaming, fun and utility cogs
+Drives their commands concurrently against tools/stub_server.py and reports
+throughput and latency percentiles
+    
+    python -m tools.benchmark --requests 500 --concurrency 50 --latency-ms 80
+
+The stub runs in-process unless --url points at one that's already running.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Allow running as a plain script as well as with -m
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+# Nothing here talks to Discord, but config refuses to load without a token
+os.environ.setdefault('DISCORD_TOKEN', 'benchmark')
+
+import discord
+from aiohttp import web
+from config import Config
+from tools.stub_server import create_app, load_responses
+
+SCENARIOS = ['steam', 'joke', 'meme', 'trivia', 'translate']
+
+class FakeResponse:
+    """interaction.response"""
+    
+    def __init__(self, interaction: 'FakeInteraction'):
+        self.interaction = interaction
+    
+    async def defer(self, **kwargs):
+        pass
+    
+    async def send_message(self, content: str = None, **kwargs):
+        self.interaction.record(content, kwargs.get('embed'))
+
+class FakeFollowup:
+    """interaction.followup"""
+    
+    def __init__(self, interaction: 'FakeInteraction'):
+        self.interaction = interaction
+    
+    async def send(self, content: str = None, **kwargs):
+        self.interaction.record(content, kwargs.get('embed'))
+
+class FakeChannel:
+    """interaction.channel"""
+    
+    def __init__(self, interaction: 'FakeInteraction'):
+        self.id = 1
+        self.interaction = interaction
+    
+    async def send(self, content: str = None, **kwargs):
+        self.interaction.record(content, kwargs.get('embed'))
+
+class FakeInteraction:
+    """Just enough of discord.Interaction for the benchmarked commands"""
+    
+    def __init__(self, user_id: int):
+        self.user = SimpleNamespace(id=user_id, name=f"bench{user_id}", display_name=f"bench{user_id}")
+        self.guild = None
+        self.channel = FakeChannel(self)
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.messages: List[Any] = []
+    
+    def record(self, content: str, embed: discord.Embed):
+        self.messages.append(embed.title if embed is not None else content)
+    
+    @property
+    def failed(self) -> bool:
+        """Whether the command replied with an error or rate-limit message"""
+        return any(
+            message and (message.startswith('❌') or message.startswith('⏳') or Config.EMOJI_ERROR in message)
+            for message in self.messages
+        )
+
+class FakeBot:
+    """Just enough of MegaBot for the cogs to run"""
+    
+    def __init__(self, db, http_client):
+        self.db = db
+        self.http_client = http_client
+        self._ready = asyncio.Event()
+    
+    async def wait_until_ready(self):
+        # Never ready, so background loops (reminders) stay idle
+        await self._ready.wait()
+    
+    async def wait_for(self, event: str, timeout: float = None, check=None):
+        # Nobody answers trivia
+        raise asyncio.TimeoutError
+    
+    def get_cog(self, name: str):
+        return None
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def http_counters(http_client) -> Dict[str, int]:
+    """Upstream and coalesced request totals across every host"""
+    hosts = http_client.stats().values()
+    return {key: sum(host[key] for host in hosts) for key in ('requests', 'coalesced')}
+
+async def run_scenario(name: str, command: Callable[[FakeInteraction, int], Awaitable[Any]],
+                       requests: int, concurrency: int, http_client) -> Dict[str, Any]:
+    """Run one command `requests` times with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+    
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            interaction = FakeInteraction(i)
+            started = time.perf_counter()
+            try:
+                await command(interaction, i)
+            except Exception:
+                failures += 1
+            else:
+                failures += interaction.failed
+            latencies.append(time.perf_counter() - started)
+    
+    before = http_counters(http_client)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    after = http_counters(http_client)
+    
+    ordered = sorted(latencies)
+    return {
+        'scenario': name,
+        'requests': requests,
+        'failures': failures,
+        # Calls that actually reached the stub vs. ones served by a shared in-flight GET
+        'upstream': after['requests'] - before['requests'],
+        'coalesced': after['coalesced'] - before['coalesced'],
+        'throughput': requests / elapsed if elapsed else 0.0,
+        'mean': statistics.fmean(ordered) if ordered else 0.0,
+        'p50': percentile(ordered, 50),
+        'p90': percentile(ordered, 90),
+        'p99': percentile(ordered, 99),
+        'max': ordered[-1] if ordered else 0.0,
+    }
+
+def print_results(results: List[Dict[str, Any]]):
+    print(f"{'scenario':<10} {'reqs':>6} {'fail':>5} {'upstream':>8} {'shared':>6} {'req/s':>9} {'mean ms':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for r in results:
+        print(
+            f"{r['scenario']:<10} {r['requests']:>6} {r['failures']:>5} {r['upstream']:>8} {r['coalesced']:>6} {r['throughput']:>9.1f} "
+            f"{r['mean'] * 1000:>9.1f} {r['p50'] * 1000:>9.1f} {r['p90'] * 1000:>9.1f} "
+            f"{r['p99'] * 1000:>9.1f} {r['max'] * 1000:>9.1f}"
+        )
+
+async def main(args: argparse.Namespace):
+    runner = None
+    base_url = args.url
+    if base_url is None:
+        app = create_app(
+            load_responses(),
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            retry_after=args.retry_after
+        )
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', 0).start()
+        base_url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+    
+    # Route every external API to the stub; all of them share its host's bucket
+    Config.STEAM_API_URL = Config.OPENTDB_API_URL = Config.REDDIT_API_URL = base_url
+    Config.JOKE_API_URL = Config.TRANSLATE_API_URL = base_url
+    Config.STEAM_API_KEY = Config.STEAM_API_KEY or 'stub'
+    Config.HTTP_DEFAULT_RATE = args.rate
+    Config.HTTP_DEFAULT_BURST = max(1, int(args.rate))
+    Config.LEGACY_DATABASE_PATH = ''
+    
+    # Imported after Config is patched so module-level defaults pick it up
+    from utils.database import Database
+    from utils.http import HTTPClient
+    from cogs.fun import Fun
+    from cogs.gaming import Gaming
+    from cogs.utility import Utility
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        db = Database(os.path.join(data_dir, 'bench.db'))
+        await db.connect()
+        http_client = HTTPClient()
+        await http_client.start()
+        
+        bot = FakeBot(db, http_client)
+        gaming, fun, utility = Gaming(bot), Fun(bot), Utility(bot)
+        commands = {
+            'steam': lambda it, i: gaming.steam_profile.callback(gaming, it, str(76561198000000000 + i % args.profiles)),
+            'joke': lambda it, i: fun.joke.callback(fun, it),
+            'meme': lambda it, i: fun.meme.callback(fun, it),
+            'trivia': lambda it, i: fun.trivia.callback(fun, it, "general", "medium"),
+            'translate': lambda it, i: utility.translate.callback(utility, it, "Hello, world", "es"),
+        }
+        
+        results = []
+        try:
+            for name in args.scenarios:
+                results.append(await run_scenario(name, commands[name], args.requests, args.concurrency, http_client))
+        finally:
+            gaming.cog_unload()
+            utility.cog_unload()
+            await http_client.close()
+            await db.close()
+    
+    print(f"Stub: {base_url}  latency {args.latency_ms}±{args.jitter_ms} ms  error rate {args.error_rate:.0%}")
+    print(f"Concurrency {args.concurrency}, pacing {'off' if args.rate <= 0 else f'{args.rate}/s'}\n")
+    print_results(results)
+    print("\nHTTP:", http_client.stats())
+    print("Steam cache:", gaming.cache_stats())
+    if runner is not None:
+        print("Stub:", runner.app['stats'])
+        await runner.cleanup()
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the API-backed cogs against a local stub")
+    parser.add_argument('--scenarios', type=lambda s: s.split(','), default=SCENARIOS,
+                        help=f"Comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument('--requests', type=int, default=200, help="Commands run per scenario")
+    parser.add_argument('--concurrency', type=int, default=20, help="Commands in flight at once")
+    parser.add_argument('--profiles', type=int, default=50, help="Distinct Steam IDs the steam scenario cycles through")
+    parser.add_argument('--rate', type=float, default=0, help="Requests/second allowed to the stub host (0 = unpaced)")
+    parser.add_argument('--url', help="Use an already running stub server instead of starting one")
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--retry-after', type=int, default=1)
+    args = parser.parse_args()
+    
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+    return args
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(parse_args()))
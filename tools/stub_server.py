@@ -0,0 +1,75 @@
+"""
+Local stub for the external APIs MegaBot calls
+Replays recorded Steam, OpenTDB, reddit, joke and LibreTranslate responses
+with configurable latency and injected errors
+    
+    python -m tools.stub_server --port 8089 --latency-ms 80 --jitter-ms 40 --error-rate 0.05
+
+Point the bot at it with STEAM_API_URL, OPENTDB_API_URL, REDDIT_API_URL,
+JOKE_API_URL and TRANSLATE_API_URL set to http://127.0.0.1:8089.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+from typing import Any, Dict
+from aiohttp import web
+
+RESPONSES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stub_responses.json')
+
+def load_responses(path: str = RESPONSES_PATH) -> Dict[str, Any]:
+    """Load recorded bodies keyed by "METHOD /route" (aiohttp route syntax)"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def create_app(responses: Dict[str, Any], latency_ms: float = 0, jitter_ms: float = 0,
+               error_rate: float = 0.0, error_status: int = 503, retry_after: int = 1) -> web.Application:
+    """Build an app serving every recorded response"""
+    app = web.Application()
+    app['stats'] = {'requests': 0, 'errors': 0}
+    
+    def make_handler(body: Any):
+        async def handler(request: web.Request) -> web.Response:
+            app['stats']['requests'] += 1
+            delay = latency_ms + random.uniform(-jitter_ms, jitter_ms)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+            
+            if error_rate and random.random() < error_rate:
+                app['stats']['errors'] += 1
+                headers = {'Retry-After': str(retry_after)} if error_status in (429, 503) else {}
+                return web.json_response({'error': 'injected'}, status=error_status, headers=headers)
+            return web.json_response(body)
+        return handler
+    
+    for route, body in responses.items():
+        method, path = route.split(' ', 1)
+        app.router.add_route(method, path, make_handler(body))
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded external API responses locally")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--responses', default=RESPONSES_PATH, help="JSON file of recorded responses")
+    parser.add_argument('--latency-ms', type=float, default=0, help="Added to every response")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="Latency varies by up to this much either way")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with --error-status")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds sent with 429/503 errors")
+    args = parser.parse_args()
+    
+    app = create_app(
+        load_responses(args.responses),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after
+    )
+    web.run_app(app, host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    main()
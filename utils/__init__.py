@@ -4,5 +4,7 @@ Provides helper functions and utilities
 """
 
 from .database import Database
+from .backup import BackupManager
+from .http import HTTPClient
 
-__all__ = ['Database']
+__all__ = ['Database', 'BackupManager', 'HTTPClient']
@@ -0,0 +1,110 @@
+"""
+Online backups for MegaBot
+Copies the live SQLite database with the backup API, off the event loop
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from config import Config
+
+logger = logging.getLogger('MegaBot.Backup')
+
+BACKUP_PREFIX = 'database-'
+BACKUP_SUFFIX = '.db'
+
+def _copy_database(source: str, target: str, pages: int) -> Dict[str, Any]:
+    """Copy source to target and verify the copy.
+    
+    Runs in a worker thread. A WAL source is copied in one step; otherwise
+    `pages` pages are copied per step. The copy is written under a temporary name and
+    only renamed into place once it passes PRAGMA integrity_check.
+    """
+    partial = f"{target}.partial"
+    try:
+        with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(partial)) as dst:
+            # In WAL mode a single-step copy reads one snapshot without blocking the writer,
+            # whereas a stepwise copy restarts every time the writer commits between steps
+            if src.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal':
+                pages = -1
+            # Otherwise each step holds a read lock for `pages` pages only, so the bot keeps writing
+            src.backup(dst, pages=pages)
+            # The copy inherits WAL mode; switch back so it stays a single self-contained file
+            dst.execute("PRAGMA journal_mode = DELETE")
+            integrity = dst.execute("PRAGMA integrity_check").fetchone()[0]
+            page_count = dst.execute("PRAGMA page_count").fetchone()[0]
+        
+        if integrity != 'ok':
+            raise sqlite3.DatabaseError(f"Backup failed integrity check: {integrity}")
+        os.replace(partial, target)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    
+    return {'pages': page_count, 'size': os.path.getsize(target)}
+
+class BackupManager:
+    """Takes, verifies and rotates copies of the live database"""
+    
+    def __init__(self, db_path: str, backup_dir: str = Config.BACKUP_DIR, keep: int = Config.BACKUP_KEEP,
+                 pages_per_step: int = Config.BACKUP_PAGES_PER_STEP):
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        # One backup at a time; a second request waits and then takes its own copy
+        self._lock = asyncio.Lock()
+    
+    def list_backups(self) -> List[str]:
+        """Paths of the existing backups, newest first"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        names = [
+            name for name in os.listdir(self.backup_dir)
+            if name.startswith(BACKUP_PREFIX) and name.endswith(BACKUP_SUFFIX)
+        ]
+        # Names embed a sortable UTC timestamp
+        return [os.path.join(self.backup_dir, name) for name in sorted(names, reverse=True)]
+    
+    def latest_age(self) -> Optional[float]:
+        """Seconds since the newest backup was written, or None if there are none"""
+        backups = self.list_backups()
+        if not backups:
+            return None
+        return time.time() - os.path.getmtime(backups[0])
+    
+    def _rotate(self) -> List[str]:
+        """Delete all but the newest `keep` backups and return the removed paths"""
+        expired = self.list_backups()[self.keep:]
+        for path in expired:
+            os.remove(path)
+        return expired
+    
+    async def create(self) -> Dict[str, Any]:
+        """Back up the database, verify the copy and rotate old backups"""
+        async with self._lock:
+            os.makedirs(self.backup_dir, exist_ok=True)
+            name = f"{BACKUP_PREFIX}{datetime.utcnow():%Y%m%d-%H%M%S}{BACKUP_SUFFIX}"
+            path = os.path.join(self.backup_dir, name)
+            
+            started = time.perf_counter()
+            result = await asyncio.to_thread(_copy_database, self.db_path, path, self.pages_per_step)
+            elapsed = time.perf_counter() - started
+            removed = await asyncio.to_thread(self._rotate)
+        
+        logger.info(f"Backed up {self.db_path} to {path} ({result['size']:,} bytes in {elapsed:.2f}s)")
+        return {
+            'name': name,
+            'path': path,
+            'size': result['size'],
+            'pages': result['pages'],
+            'seconds': round(elapsed, 3),
+            'removed': [os.path.basename(p) for p in removed],
+            'kept': len(self.list_backups())
+        }
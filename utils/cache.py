@@ -0,0 +1,180 @@
+"""
+In-memory caches for MegaBot
+Keeps hot economy state out of SQLite
+"""
+
+import heapq
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+class BoostCache:
+    """Bounded LRU of active boost effects per (guild_id, user_id), expired by a heap"""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max(1, max_size)
+        # (guild_id, user_id) -> {effect: expiry timestamp, or None if permanent}
+        self._entries: "OrderedDict[Tuple[int, int], Dict[str, Optional[float]]]" = OrderedDict()
+        # Min-heap of (expiry, guild_id, user_id, effect) for every timed effect
+        self._expiries: List[Tuple[float, int, int, str]] = []
+        # Bumped on every change so loads that raced a write can be discarded
+        self.version = 0
+    
+    def _evict_expired(self, now: float):
+        """Drop effects whose expiry has passed"""
+        while self._expiries and self._expiries[0][0] <= now:
+            expiry, guild_id, user_id, effect = heapq.heappop(self._expiries)
+            effects = self._entries.get((guild_id, user_id))
+            # Heap entries go stale when an effect is extended or the user is invalidated
+            if effects is not None and effects.get(effect) == expiry:
+                del effects[effect]
+                if not effects:
+                    # Nothing left worth remembering; the next read reloads
+                    del self._entries[(guild_id, user_id)]
+    
+    def get(self, guild_id: int, user_id: int) -> Optional[frozenset]:
+        """Get a user's active effects, or None if they aren't cached"""
+        self._evict_expired(time.time())
+        effects = self._entries.get((guild_id, user_id))
+        if effects is None:
+            return None
+        self._entries.move_to_end((guild_id, user_id))
+        return frozenset(effects)
+    
+    def load(self, guild_id: int, user_id: int, boosts: Iterable[Tuple[str, Optional[float]]]):
+        """Cache a user's effects from (effect, expiry) rows read from the database"""
+        self._entries[(guild_id, user_id)] = {}
+        self._entries.move_to_end((guild_id, user_id))
+        for effect, expiry in boosts:
+            self._merge(guild_id, user_id, effect, expiry)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def add(self, guild_id: int, user_id: int, effect: str, expiry: Optional[float]):
+        """Write through a newly stored boost"""
+        self.version += 1
+        if (guild_id, user_id) in self._entries:
+            self._merge(guild_id, user_id, effect, expiry)
+    
+    def invalidate(self, guild_id: int, user_id: int):
+        """Forget a user's effects so the next read reloads them"""
+        self.version += 1
+        self._entries.pop((guild_id, user_id), None)
+    
+    def _merge(self, guild_id: int, user_id: int, effect: str, expiry: Optional[float]):
+        effects = self._entries[(guild_id, user_id)]
+        if effect in effects:
+            current = effects[effect]
+            # Keep whichever boost with this effect lasts longest
+            if current is None or (expiry is not None and expiry <= current):
+                return
+        effects[effect] = expiry
+        if expiry is not None:
+            heapq.heappush(self._expiries, (expiry, guild_id, user_id, effect))
+
+class BalanceCache:
+    """Bounded LRU of wallet balances keyed by (guild_id, user_id)"""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped on every write so a fill read before the write can be discarded
+        self.generation = 0
+    
+    def get(self, guild_id: int, user_id: int) -> Optional[int]:
+        """Get a cached balance, or None on a miss"""
+        key = (guild_id, user_id)
+        balance = self._entries.get(key)
+        if balance is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return balance
+    
+    def put(self, guild_id: int, user_id: int, balance: int):
+        """Store a committed balance from a mutation"""
+        self.generation += 1
+        self._store((guild_id, user_id), balance)
+    
+    def fill(self, guild_id: int, user_id: int, balance: int, generation: int):
+        """Store a balance read after a miss, unless a write landed meanwhile"""
+        if generation == self.generation:
+            self._store((guild_id, user_id), balance)
+    
+    def invalidate(self, guild_id: int, user_id: int):
+        """Forget one balance"""
+        self.generation += 1
+        self._entries.pop((guild_id, user_id), None)
+    
+    def clear(self):
+        """Forget every balance"""
+        self.generation += 1
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """Counters for sizing the cache"""
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+    
+    def _store(self, key: Tuple[int, int], balance: int):
+        self._entries[key] = balance
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+class TTLCache:
+    """Bounded LRU whose entries go stale after `ttl` seconds and are dropped `stale_ttl` seconds later"""
+    
+    def __init__(self, ttl: float, stale_ttl: float, max_size: int):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max(1, max_size)
+        # key -> (value, monotonic time it was stored)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Tuple[Any, bool]]:
+        """Get (value, is_fresh), or None if the key is missing or too old to serve"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                if age <= self.ttl:
+                    self.hits += 1
+                    return value, True
+                self.stale_hits += 1
+                return value, False
+            del self._entries[key]
+        self.misses += 1
+        return None
+    
+    def put(self, key: Hashable, value: Any):
+        """Store a freshly fetched value"""
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def stats(self) -> Dict[str, int]:
+        """Counters for sizing the cache and its TTLs"""
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+        }
@@ -3,36 +3,514 @@ Database utilities for MegaBot
 Handles all database operations using SQLite
 """
 
+import asyncio
+import logging
+import os
 import sqlite3
+import time
 import aiosqlite
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Tuple
+from config import Config
+from .cache import BalanceCache, BoostCache
+from .leaderboard import Leaderboard
+
+logger = logging.getLogger('MegaBot.Database')
+
+# Database whose transaction is open in the current task, if any
+_active_transaction: ContextVar[Optional['Database']] = ContextVar('active_transaction', default=None)
+
+def _epoch(value: Optional[datetime]) -> Optional[int]:
+    """Convert a naive UTC datetime to whole Unix seconds"""
+    return int(value.replace(tzinfo=timezone.utc).timestamp()) if value else None
+
+def _now() -> int:
+    """Current time in whole Unix seconds, the unit every timestamp column is stored in"""
+    return int(time.time())
+
+async def _add_lookup_indexes(db: aiosqlite.Connection):
+    """Secondary indexes for inventory, boost, rob history and reminder lookups"""
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_inventory_owner_item ON inventory (user_id, guild_id, item_name)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_shop_items_owner_expiry ON shop_items (user_id, guild_id, expiry_date)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_shop_items_expiry ON shop_items (expiry_date)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_rob_history_robber ON rob_history (robber_id, guild_id, timestamp)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_rob_history_victim ON rob_history (victim_id, guild_id)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_reminders_time ON reminders (remind_time)")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_homework_user ON homework (user_id)")
+
+async def _economy_per_guild_key(db: aiosqlite.Connection):
+    """Rebuild economy keyed on (guild_id, user_id) with a per-guild total index"""
+    async with db.execute("PRAGMA table_info(economy)") as cursor:
+        key = {row[1]: row[5] for row in await cursor.fetchall() if row[5]}
+    if key != {'guild_id': 1, 'user_id': 2}:
+        await _rebuild_economy(db)
+    
+    # Lets per-guild leaderboards read the top rows straight off the index
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_economy_guild_total ON economy (guild_id, (balance + bank))")
+
+async def _rebuild_economy(db: aiosqlite.Connection):
+    """Copy economy into a table with the same layout init_db creates"""
+    await db.execute("""
+        CREATE TABLE economy_new (
+            user_id INTEGER NOT NULL,
+            guild_id INTEGER NOT NULL DEFAULT 0,
+            balance INTEGER DEFAULT 0,
+            bank INTEGER DEFAULT 0,
+            last_daily INTEGER,
+            last_work INTEGER,
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID
+    """)
+    await db.execute("""
+        INSERT OR IGNORE INTO economy_new (user_id, guild_id, balance, bank, last_daily, last_work)
+        SELECT user_id, COALESCE(guild_id, 0), balance, bank, last_daily, last_work FROM economy
+    """)
+    await db.execute("DROP TABLE economy")
+    await db.execute("ALTER TABLE economy_new RENAME TO economy")
+
+def _pragma_profile() -> Dict[str, Any]:
+    """Connection pragmas from Config, in the order they are applied"""
+    return {
+        'journal_mode': Config.DB_JOURNAL_MODE,
+        'synchronous': Config.DB_SYNCHRONOUS,
+        'mmap_size': Config.DB_MMAP_SIZE,
+        'cache_size': Config.DB_CACHE_SIZE,
+        'temp_store': Config.DB_TEMP_STORE,
+        'busy_timeout': Config.DB_BUSY_TIMEOUT_MS,
+    }
+
+async def _import_legacy_database(db: aiosqlite.Connection):
+    """Copy users, warnings and pending reminders out of the old bot_data.db"""
+    path = Config.LEGACY_DATABASE_PATH
+    if not path or not os.path.exists(path):
+        return
+    
+    # The legacy file is only ever read, through its own connection
+    async with aiosqlite.connect(f"file:{path}?mode=ro", uri=True) as legacy:
+        async with legacy.execute("SELECT name FROM sqlite_master WHERE type = 'table'") as cursor:
+            tables = {row[0] for row in await cursor.fetchall()}
+        
+        if 'users' in tables:
+            # Legacy accounts were global, so they land in the guild-less (0) economy
+            async with legacy.execute("SELECT user_id, balance, last_daily, last_work FROM users") as cursor:
+                users = await cursor.fetchall()
+            await db.executemany(
+                """INSERT OR IGNORE INTO economy (user_id, guild_id, balance, bank, last_daily, last_work)
+                   VALUES (?, 0, ?, 0, ?, ?)""",
+                users
+            )
+            logger.info(f"Imported {len(users)} accounts from {path}")
+        
+        if 'warnings' in tables:
+            async with legacy.execute("SELECT user_id, moderator_id, reason, timestamp FROM warnings") as cursor:
+                warnings = await cursor.fetchall()
+            await db.executemany(
+                "INSERT INTO warnings (user_id, guild_id, moderator_id, reason, timestamp) VALUES (?, 0, ?, ?, ?)",
+                warnings
+            )
+            logger.info(f"Imported {len(warnings)} warnings from {path}")
+        
+        if 'reminders' in tables:
+            async with legacy.execute(
+                "SELECT user_id, channel_id, message, reminder_time FROM reminders WHERE reminder_time IS NOT NULL"
+            ) as cursor:
+                reminders = await cursor.fetchall()
+            await db.executemany(
+                "INSERT INTO reminders (user_id, channel_id, message, remind_time) VALUES (?, ?, ?, ?)",
+                reminders
+            )
+            logger.info(f"Imported {len(reminders)} reminders from {path}")
+    
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_warnings_member ON warnings (guild_id, user_id)")
+
+async def _add_rob_stats_rollup(db: aiosqlite.Connection):
+    """Per-member rob totals kept current by a trigger on rob_history"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS rob_stats (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            successful INTEGER NOT NULL DEFAULT 0,
+            times_robbed INTEGER NOT NULL DEFAULT 0,
+            last_rob TIMESTAMP,
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID
+    """)
+    await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS rob_history_rollup AFTER INSERT ON rob_history
+        BEGIN
+            INSERT INTO rob_stats (guild_id, user_id, attempts, successful, last_rob)
+            VALUES (NEW.guild_id, NEW.robber_id, 1, NEW.success != 0, NEW.timestamp)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                attempts = attempts + 1,
+                successful = successful + excluded.successful,
+                last_rob = excluded.last_rob;
+            INSERT INTO rob_stats (guild_id, user_id, times_robbed)
+            VALUES (NEW.guild_id, NEW.victim_id, 1)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET times_robbed = times_robbed + 1;
+        END
+    """)
+    
+    # Backfill from the history recorded so far
+    await db.execute("""
+        INSERT INTO rob_stats (guild_id, user_id, attempts, successful, times_robbed, last_rob)
+        SELECT guild_id, user_id, SUM(attempts), SUM(successful), SUM(times_robbed), MAX(last_rob)
+        FROM (
+            SELECT guild_id, robber_id AS user_id, 1 AS attempts, success != 0 AS successful,
+                   0 AS times_robbed, timestamp AS last_rob
+            FROM rob_history
+            UNION ALL
+            SELECT guild_id, victim_id, 0, 0, 1, NULL FROM rob_history
+        )
+        GROUP BY guild_id, user_id
+    """)
+    
+    # Reads go to rob_stats now; raw rows are only pruned by age
+    await db.execute("DROP INDEX IF EXISTS idx_rob_history_robber")
+    await db.execute("DROP INDEX IF EXISTS idx_rob_history_victim")
+    await db.execute("CREATE INDEX IF NOT EXISTS idx_rob_history_time ON rob_history (timestamp)")
+
+# Columns that held ISO-8601 text before timestamps were stored as Unix seconds
+_TIMESTAMP_COLUMNS = [
+    ('economy', 'last_daily'),
+    ('economy', 'last_work'),
+    ('shop_items', 'expiry_date'),
+    ('reminders', 'remind_time'),
+    ('warnings', 'timestamp'),
+    ('rob_history', 'timestamp'),
+    ('rob_stats', 'last_rob'),
+]
+
+async def _epoch_timestamps(db: aiosqlite.Connection):
+    """Rewrite ISO-8601 timestamp text as integer Unix seconds"""
+    # strftime('%s') reads both isoformat() and CURRENT_TIMESTAMP text as UTC
+    for table, column in _TIMESTAMP_COLUMNS:
+        await db.execute(
+            f"UPDATE {table} SET {column} = CAST(strftime('%s', {column}) AS INTEGER) WHERE typeof({column}) = 'text'"
+        )
+
+async def _add_steam_vanity_cache(db: aiosqlite.Connection):
+    """Persisted Steam vanity URL to SteamID resolutions"""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS steam_vanity (
+            vanity TEXT NOT NULL COLLATE NOCASE PRIMARY KEY,
+            steam_id TEXT NOT NULL,
+            resolved_at INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+# Schema migrations as (version, description, coroutine), applied in order on
+# connect and tracked with PRAGMA user_version. Only ever append to this list.
+MIGRATIONS = [
+    (1, "Add lookup indexes", _add_lookup_indexes),
+    (2, "Key economy accounts per guild", _economy_per_guild_key),
+    (3, "Import legacy bot_data.db", _import_legacy_database),
+    (4, "Roll up rob history per member", _add_rob_stats_rollup),
+    (5, "Store timestamps as Unix seconds", _epoch_timestamps),
+    (6, "Cache Steam vanity URLs", _add_steam_vanity_cache),
+]
 
 class Database:
-    def __init__(self, db_path: str = "data/database.db"):
+    def __init__(self, db_path: str = "data/database.db", pool_size: int = Config.DB_POOL_SIZE,
+                 group_commit: bool = Config.DB_GROUP_COMMIT):
         self.db_path = db_path
+        self.pool_size = max(1, pool_size)
+        self.group_commit = group_commit
+        
+        # One writer connection (SQLite allows a single writer at a time)
+        # plus a pool of reader connections that methods borrow from
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: Optional[asyncio.Queue] = None
+        self._reader_conns: List[aiosqlite.Connection] = []
+        
+        # Callbacks to run once the open transaction commits
+        self._commit_hooks: List[Callable[[], None]] = []
+        
+        # Group commit: queued (query, params, future) writes and the task flushing them
+        self._pending: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        
+        # Pragmas applied to every connection, and the values SQLite reports back
+        self._pragmas = _pragma_profile()
+        self.pragma_profile: Dict[str, Any] = {}
+        self._checkpointer: Optional[asyncio.Task] = None
+        
+        self._boosts = BoostCache(Config.BOOST_CACHE_SIZE)
+        self._balances = BalanceCache(Config.BALANCE_CACHE_SIZE)
+        
+        # Per-guild rankings by balance + bank; None until seeded, when SQL is used instead
+        self._rankings: Optional[Leaderboard] = None
     
     async def connect(self):
-        """Initialize database connection and tables"""
+        """Open the connection pool and initialize tables"""
+        if self._writer is not None:
+            return
+        
+        self._writer = await aiosqlite.connect(self.db_path)
+        await self._apply_pragmas(self._writer)
         await self.init_db()
+        await self.migrate()
+        await self._seed_rankings()
+        
+        self._readers = asyncio.Queue()
+        for _ in range(self.pool_size):
+            conn = await aiosqlite.connect(self.db_path)
+            await self._apply_pragmas(conn)
+            self._reader_conns.append(conn)
+            self._readers.put_nowait(conn)
+        
+        if str(self.pragma_profile.get('journal_mode')).lower() == 'wal' and Config.DB_CHECKPOINT_INTERVAL > 0:
+            self._checkpointer = asyncio.create_task(self._checkpoint_wal())
+        
+        if self.group_commit:
+            self._pending = asyncio.Queue()
+            self._flusher = asyncio.create_task(self._flush_pending())
+        
+        logger.info(f"Database connected: {self.db_path} (1 writer, {self.pool_size} readers)")
     
     async def close(self):
-        """Close database connection (no-op since we use context managers)"""
-        pass
+        """Drain the connection pool and close every connection"""
+        if self._writer is None:
+            return
         
+        if self._checkpointer is not None:
+            self._checkpointer.cancel()
+            self._checkpointer = None
+        
+        if self._flusher is not None:
+            # Commit everything already queued, then stop the flusher
+            self._pending.put_nowait(None)
+            await self._flusher
+            self._flusher = None
+            self._pending = None
+        
+        # Wait for borrowed readers to be returned before closing them
+        for _ in self._reader_conns:
+            await self._readers.get()
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns.clear()
+        self._readers = None
+        
+        async with self._write_lock:
+            await self._writer.close()
+            self._writer = None
+        
+        logger.info("Database connection pool closed")
+    
+    @property
+    def connected(self) -> bool:
+        """Whether the connection pool is open"""
+        return self._writer is not None
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for the in-memory caches"""
+        return {'balances': self._balances.stats()}
+    
+    async def _apply_pragmas(self, conn: aiosqlite.Connection):
+        """Apply the pragma profile to a connection"""
+        for name, value in self._pragmas.items():
+            # journal_mode is persistent and set once through the writer
+            if name == 'journal_mode' and conn is not self._writer:
+                continue
+            await conn.execute(f"PRAGMA {name} = {value}")
+        
+        if conn is self._writer:
+            for name in self._pragmas:
+                async with conn.execute(f"PRAGMA {name}") as cursor:
+                    row = await cursor.fetchone()
+                self.pragma_profile[name] = row[0] if row else None
+    
+    async def _checkpoint_wal(self):
+        """Periodically fold the WAL back into the database file and truncate it"""
+        while True:
+            await asyncio.sleep(Config.DB_CHECKPOINT_INTERVAL)
+            try:
+                async with self._write_lock:
+                    async with self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)") as cursor:
+                        busy, log_pages, checkpointed = await cursor.fetchone()
+                if busy:
+                    logger.debug("WAL checkpoint skipped: readers still active")
+                else:
+                    logger.debug(f"WAL checkpoint: {checkpointed}/{log_pages} pages")
+            except sqlite3.Error as e:
+                logger.error(f"WAL checkpoint failed: {e}")
+    
+    @asynccontextmanager
+    async def _read(self):
+        """Borrow a reader connection from the pool"""
+        if _active_transaction.get() is self:
+            # Read our own uncommitted writes
+            yield self._writer
+            return
+        
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+    
+    @asynccontextmanager
+    async def _write(self):
+        """Borrow the writer connection; commits on success, rolls back on error"""
+        if _active_transaction.get() is self:
+            # The enclosing transaction commits or rolls back as a whole
+            yield self._writer
+            return
+        
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            else:
+                await self._writer.commit()
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """Run several mutations as one BEGIN IMMEDIATE ... COMMIT.
+        
+        Database methods awaited inside the block share the writer connection
+        and are rolled back together if the block raises. Nested blocks join
+        the outer transaction.
+        """
+        if _active_transaction.get() is self:
+            yield self
+            return
+        
+        async with self._write_lock:
+            await self._writer.execute("BEGIN IMMEDIATE")
+            token = _active_transaction.set(self)
+            self._commit_hooks = []
+            try:
+                yield self
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            else:
+                await self._writer.commit()
+                for hook in self._commit_hooks:
+                    hook()
+            finally:
+                self._commit_hooks = []
+                _active_transaction.reset(token)
+    
+    def _after_commit(self, hook: Callable[[], None]):
+        """Run hook now, or when the open transaction commits"""
+        if _active_transaction.get() is self:
+            self._commit_hooks.append(hook)
+        else:
+            hook()
+    
+    async def _execute_write(self, query: str, params,
+                             on_commit: Optional[Callable[[List[tuple]], None]] = None) -> List[tuple]:
+        """Run a single write statement and return its rows once committed.
+        
+        With group commit enabled, statements outside a transaction are queued
+        and committed together with other callers' writes. on_commit(rows) runs
+        once the write commits, even if the caller was cancelled meanwhile.
+        """
+        if self._pending is None or _active_transaction.get() is self:
+            async with self._write() as db:
+                async with db.execute(query, params) as cursor:
+                    rows = await cursor.fetchall()
+            if on_commit is not None:
+                on_commit(rows)
+            return rows
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending.put_nowait((query, params, future, on_commit))
+        return await future
+    
+    async def _flush_pending(self):
+        """Commit queued writes in batches until close() enqueues None"""
+        loop = asyncio.get_running_loop()
+        window = Config.DB_GROUP_COMMIT_WINDOW_MS / 1000
+        max_batch = max(1, Config.DB_GROUP_COMMIT_MAX_BATCH)
+        
+        stopping = False
+        while not stopping:
+            item = await self._pending.get()
+            if item is None:
+                break
+            
+            # Collect more writes until the window closes or the batch is full
+            batch = [item]
+            deadline = loop.time() + window
+            while len(batch) < max_batch:
+                try:
+                    item = await asyncio.wait_for(self._pending.get(), max(0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                await self._commit_batch(batch)
+            except Exception as e:
+                # Never let one bad batch stop the flusher and strand later writers
+                logger.error(f"Group commit flusher error: {e}")
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    async def _commit_batch(self, batch: List[tuple]):
+        """Run a batch of queued writes in one transaction and resolve their futures"""
+        results = []
+        async with self._write_lock:
+            try:
+                await self._writer.execute("BEGIN IMMEDIATE")
+                for query, params, future, on_commit in batch:
+                    # A savepoint per write so one failing statement doesn't sink the batch
+                    await self._writer.execute("SAVEPOINT queued_write")
+                    try:
+                        async with self._writer.execute(query, params) as cursor:
+                            results.append((future, on_commit, await cursor.fetchall(), None))
+                    except sqlite3.Error as e:
+                        await self._writer.execute("ROLLBACK TO queued_write")
+                        results.append((future, on_commit, None, e))
+                    await self._writer.execute("RELEASE queued_write")
+                await self._writer.commit()
+            except Exception as e:
+                logger.error(f"Group commit of {len(batch)} writes failed: {e}")
+                try:
+                    await self._writer.rollback()
+                except Exception as rollback_error:
+                    logger.error(f"Rollback after failed group commit failed: {rollback_error}")
+                results = [(future, None, None, e) for _, _, future, _ in batch]
+        
+        # Callers only see their results once the batch is durable
+        for future, on_commit, rows, error in results:
+            if error is None and on_commit is not None:
+                # Keep caches in step with the database even if the caller has gone
+                on_commit(rows)
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(rows)
+    
     async def init_db(self):
         """Initialize database tables"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Economy table
+        async with self._write() as db:
+            # Economy table (one account per user per guild)
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS economy (
-                    user_id INTEGER PRIMARY KEY,
-                    guild_id INTEGER,
+                    user_id INTEGER NOT NULL,
+                    guild_id INTEGER NOT NULL DEFAULT 0,
                     balance INTEGER DEFAULT 0,
                     bank INTEGER DEFAULT 0,
-                    last_daily TIMESTAMP,
-                    last_work TIMESTAMP
-                )
+                    last_daily INTEGER,
+                    last_work INTEGER,
+                    PRIMARY KEY (guild_id, user_id)
+                ) WITHOUT ROWID
             """)
             
             # Reminders table
@@ -42,7 +520,7 @@ class Database:
                     user_id INTEGER,
                     channel_id INTEGER,
                     message TEXT,
-                    remind_time TIMESTAMP
+                    remind_time INTEGER
                 )
             """)
             
@@ -81,6 +559,18 @@ class Database:
                 )
             """)
             
+            # Moderation warnings
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS warnings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER,
+                    guild_id INTEGER DEFAULT 0,
+                    moderator_id INTEGER,
+                    reason TEXT,
+                    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+                )
+            """)
+            
             # Shop items/boosts table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS shop_items (
@@ -89,7 +579,7 @@ class Database:
                     guild_id INTEGER,
                     item_name TEXT,
                     effect TEXT,
-                    expiry_date TIMESTAMP,
+                    expiry_date INTEGER,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
@@ -116,90 +606,242 @@ class Database:
                     guild_id INTEGER,
                     amount INTEGER,
                     success BOOLEAN,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    timestamp INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
                 )
             """)
+    
+    async def migrate(self):
+        """Apply any schema migrations newer than the file's user_version"""
+        async with self._writer.execute("PRAGMA user_version") as cursor:
+            version = (await cursor.fetchone())[0]
+        
+        for target, description, migration in MIGRATIONS:
+            if target <= version:
+                continue
             
-            await db.commit()
+            logger.info(f"Applying database migration {target}: {description}")
+            async with self.transaction():
+                await migration(self._writer)
+                await self._writer.execute(f"PRAGMA user_version = {target}")
+            version = target
     
     # Economy functions
     async def get_balance(self, user_id: int, guild_id: int = 0) -> int:
         """Get user's balance (simplified to return just balance amount)"""
-        async with aiosqlite.connect(self.db_path) as db:
+        # Inside a transaction the cache may lag our own uncommitted writes
+        in_transaction = _active_transaction.get() is self
+        if not in_transaction:
+            balance = self._balances.get(guild_id, user_id)
+            if balance is not None:
+                return balance
+        
+        generation = self._balances.generation
+        async with self._read() as db:
             async with db.execute(
-                "SELECT balance FROM economy WHERE user_id = ? AND (guild_id = ? OR guild_id = 0)",
+                "SELECT balance FROM economy WHERE user_id = ? AND guild_id = ?",
                 (user_id, guild_id)
             ) as cursor:
                 row = await cursor.fetchone()
-                if row:
-                    return row[0]
-                else:
-                    # Create new account with starting balance
-                    await db.execute(
-                        "INSERT INTO economy (user_id, guild_id, balance, bank) VALUES (?, ?, 1000, 0)",
-                        (user_id, guild_id)
-                    )
-                    await db.commit()
-                    return 1000
+        
+        if row:
+            if not in_transaction:
+                self._balances.fill(guild_id, user_id, row[0], generation)
+            return row[0]
+        
+        # Create new account with starting balance (or read one created meanwhile)
+        async with self._write() as db:
+            async with db.execute(
+                """INSERT INTO economy (user_id, guild_id, balance, bank) VALUES (?, ?, ?, 0)
+                   ON CONFLICT(guild_id, user_id) DO UPDATE SET balance = balance
+                   RETURNING balance, bank""",
+                (user_id, guild_id, Config.STARTING_BALANCE)
+            ) as cursor:
+                rows = await cursor.fetchall()
+        self._record_balance(user_id, guild_id, *rows[0])
+        return rows[0][0]
     
-    async def update_balance(self, user_id: int, amount: int, guild_id: int = 0) -> int:
-        """Update user's balance and return new balance"""
-        # Ensure user exists first
-        await self.get_balance(user_id, guild_id)
+    async def get_balances(self, user_ids: List[int], guild_id: int) -> Dict[int, int]:
+        """Get several users' balances in one query, without creating accounts"""
+        in_transaction = _active_transaction.get() is self
+        balances = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            balance = None if in_transaction else self._balances.get(guild_id, user_id)
+            if balance is None:
+                missing.append(user_id)
+            else:
+                balances[user_id] = balance
+        if not missing:
+            return balances
         
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "UPDATE economy SET balance = balance + ? WHERE user_id = ? AND (guild_id = ? OR guild_id = 0)",
-                (amount, user_id, guild_id)
-            )
-            await db.commit()
+        generation = self._balances.generation
+        placeholders = ", ".join("?" for _ in missing)
+        async with self._read() as db:
+            async with db.execute(
+                f"SELECT user_id, balance FROM economy WHERE guild_id = ? AND user_id IN ({placeholders})",
+                [guild_id] + missing
+            ) as cursor:
+                rows = await cursor.fetchall()
+        
+        for user_id, balance in rows:
+            balances[user_id] = balance
+            if not in_transaction:
+                self._balances.fill(guild_id, user_id, balance, generation)
+        for user_id in missing:
+            # Accounts open with the starting balance on their first write
+            balances.setdefault(user_id, Config.STARTING_BALANCE)
+        return balances
+    
+    def _record_balance(self, user_id: int, guild_id: int, balance: int, bank: int):
+        """Update the balance cache and rankings once the write that produced balance commits"""
+        def apply():
+            self._balances.put(guild_id, user_id, balance)
+            if self._rankings is not None:
+                self._rankings.update(guild_id, user_id, balance + bank)
+        self._after_commit(apply)
+    
+    def _balance_recorder(self, user_id: int, guild_id: int) -> Callable[[List[tuple]], None]:
+        """on_commit callback recording the (balance, bank) row a write returned"""
+        def record(rows: List[tuple]):
+            if rows:
+                self._record_balance(user_id, guild_id, *rows[0])
+        return record
+    
+    async def _seed_rankings(self):
+        """Load every account's total into the in-memory rankings"""
+        async with self._writer.execute("SELECT guild_id, user_id, balance + bank FROM economy") as cursor:
+            rows = await cursor.fetchall()
+        self._rankings = Leaderboard()
+        self._rankings.seed(rows)
+        logger.info(f"Leaderboard seeded with {len(rows)} accounts")
+    
+    async def adjust_balance(self, user_id: int, guild_id: int, amount: int,
+                             floor: Optional[int] = None, ceiling: Optional[int] = None) -> Optional[int]:
+        """Atomically add amount to a balance and return the new balance.
+        
+        Creates the account on first use. If the result would fall below floor
+        or above ceiling nothing is changed and None is returned.
+        """
+        bounds = []
+        if floor is not None:
+            bounds.append("balance + :amount >= :floor")
+        if ceiling is not None:
+            bounds.append("balance + :amount <= :ceiling")
+        guard = " AND ".join(bounds) or "1"
+        
+        params = {
+            'user_id': user_id,
+            'guild_id': guild_id,
+            'amount': amount,
+            'start': Config.STARTING_BALANCE,
+            'floor': floor,
+            'ceiling': ceiling
+        }
+        
+        opening = Config.STARTING_BALANCE + amount
+        if (floor is None or opening >= floor) and (ceiling is None or opening <= ceiling):
+            # Upsert: a new account opens with the starting balance plus amount
+            query = f"""INSERT INTO economy (user_id, guild_id, balance, bank)
+                        VALUES (:user_id, :guild_id, :start + :amount, 0)
+                        ON CONFLICT(guild_id, user_id) DO UPDATE SET balance = balance + :amount
+                        WHERE {guard}
+                        RETURNING balance, bank"""
+        else:
+            # A new account would already be out of bounds, so only touch existing rows
+            query = f"""UPDATE economy SET balance = balance + :amount
+                        WHERE user_id = :user_id AND guild_id = :guild_id AND {guard}
+                        RETURNING balance, bank"""
+        
+        rows = await self._execute_write(query, params, self._balance_recorder(user_id, guild_id))
+        return rows[0][0] if rows else None
+    
+    async def set_balance(self, user_id: int, guild_id: int, amount: int) -> int:
+        """Set user's balance to an exact amount and return it"""
+        async with self._write() as db:
+            async with db.execute(
+                """INSERT INTO economy (user_id, guild_id, balance, bank)
+                   VALUES (?, ?, ?, 0)
+                   ON CONFLICT(guild_id, user_id) DO UPDATE SET balance = excluded.balance
+                   RETURNING balance, bank""",
+                (user_id, guild_id, amount)
+            ) as cursor:
+                rows = await cursor.fetchall()
+        self._record_balance(user_id, guild_id, *rows[0])
+        return rows[0][0]
+    
+    async def adjust_balances(self, user_ids: List[int], guild_id: int, amount: int, chunk_size: int = 500,
+                              on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None) -> int:
+        """Add amount to many balances with one upsert per chunk, clamping at zero.
+        
+        Each chunk commits on its own; on_progress(done, total) is awaited after
+        every chunk. Returns the number of accounts changed.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        opening = max(0, Config.STARTING_BALANCE + amount)
+        done = 0
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            placeholders = ", ".join("(?, ?, ?, 0)" for _ in chunk)
+            params = [value for user_id in chunk for value in (user_id, guild_id, opening)]
+            async with self._write() as db:
+                async with db.execute(
+                    f"""INSERT INTO economy (user_id, guild_id, balance, bank)
+                        VALUES {placeholders}
+                        ON CONFLICT(guild_id, user_id) DO UPDATE SET balance = MAX(0, balance + ?)
+                        RETURNING user_id, balance, bank""",
+                    params + [amount]
+                ) as cursor:
+                    rows = await cursor.fetchall()
+            for user_id, balance, bank in rows:
+                self._record_balance(user_id, guild_id, balance, bank)
             
-        # Return new balance
-        return await self.get_balance(user_id, guild_id)
+            done += len(chunk)
+            if on_progress is not None:
+                await on_progress(done, len(user_ids))
+        return done
+    
+    async def update_balance(self, user_id: int, amount: int, guild_id: int = 0) -> int:
+        """Update user's balance and return new balance"""
+        return await self.adjust_balance(user_id, guild_id, amount)
     
-    async def get_last_daily(self, user_id: int, guild_id: int = 0) -> Optional[datetime]:
-        """Get last daily claim timestamp"""
-        async with aiosqlite.connect(self.db_path) as db:
+    async def get_last_daily(self, user_id: int, guild_id: int = 0) -> Optional[int]:
+        """Get last daily claim time in Unix seconds"""
+        async with self._read() as db:
             async with db.execute(
-                "SELECT last_daily FROM economy WHERE user_id = ? AND (guild_id = ? OR guild_id = 0)",
+                "SELECT last_daily FROM economy WHERE user_id = ? AND guild_id = ?",
                 (user_id, guild_id)
             ) as cursor:
                 row = await cursor.fetchone()
-                if row and row[0]:
-                    return datetime.fromisoformat(row[0])
-                return None
+                return row[0] if row else None
     
     async def set_last_daily(self, user_id: int, guild_id: int = 0):
         """Set last daily claim timestamp"""
-        await self.get_balance(user_id, guild_id)  # Ensure user exists
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "UPDATE economy SET last_daily = ? WHERE user_id = ? AND (guild_id = ? OR guild_id = 0)",
-                (datetime.utcnow().isoformat(), user_id, guild_id)
-            )
-            await db.commit()
+        await self._touch_timestamp('last_daily', user_id, guild_id)
     
-    async def get_last_work(self, user_id: int, guild_id: int = 0) -> Optional[datetime]:
-        """Get last work timestamp"""
-        async with aiosqlite.connect(self.db_path) as db:
+    async def get_last_work(self, user_id: int, guild_id: int = 0) -> Optional[int]:
+        """Get last work time in Unix seconds"""
+        async with self._read() as db:
             async with db.execute(
-                "SELECT last_work FROM economy WHERE user_id = ? AND (guild_id = ? OR guild_id = 0)",
+                "SELECT last_work FROM economy WHERE user_id = ? AND guild_id = ?",
                 (user_id, guild_id)
             ) as cursor:
                 row = await cursor.fetchone()
-                if row and row[0]:
-                    return datetime.fromisoformat(row[0])
-                return None
+                return row[0] if row else None
     
     async def set_last_work(self, user_id: int, guild_id: int = 0):
         """Set last work timestamp"""
-        await self.get_balance(user_id, guild_id)  # Ensure user exists
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "UPDATE economy SET last_work = ? WHERE user_id = ? AND (guild_id = ? OR guild_id = 0)",
-                (datetime.utcnow().isoformat(), user_id, guild_id)
-            )
-            await db.commit()
+        await self._touch_timestamp('last_work', user_id, guild_id)
+    
+    async def _touch_timestamp(self, column: str, user_id: int, guild_id: int):
+        """Set a cooldown column to now, creating the account if needed"""
+        await self._execute_write(
+            f"""INSERT INTO economy (user_id, guild_id, balance, bank, {column})
+                VALUES (?, ?, ?, 0, ?)
+                ON CONFLICT(guild_id, user_id) DO UPDATE SET {column} = excluded.{column}
+                RETURNING balance, bank""",
+            (user_id, guild_id, Config.STARTING_BALANCE, _now()),
+            self._balance_recorder(user_id, guild_id)
+        )
     
     async def add_earned(self, user_id: int, amount: int, guild_id: int = 0):
         """Track earnings (for statistics) - currently just a placeholder"""
@@ -208,56 +850,131 @@ class Database:
     
     async def get_leaderboard(self, limit: int = 10, guild_id: int = 0) -> List[tuple]:
         """Get economy leaderboard"""
-        async with aiosqlite.connect(self.db_path) as db:
+        if self._rankings is not None and _active_transaction.get() is not self:
+            return self._rankings.get(guild_id).top(limit)
+        
+        async with self._read() as db:
             async with db.execute(
-                """SELECT user_id, (balance + bank) as total 
-                   FROM economy 
-                   WHERE guild_id = ? OR guild_id = 0
-                   ORDER BY total DESC 
+                """SELECT user_id, (balance + bank) as total
+                   FROM economy
+                   WHERE guild_id = ?
+                   ORDER BY total DESC, user_id
                    LIMIT ?""",
                 (guild_id, limit)
             ) as cursor:
                 return await cursor.fetchall()
     
-    async def check_cooldown(self, user_id: int, guild_id: int, cooldown_type: str) -> Optional[datetime]:
-        """Check if user is on cooldown"""
-        async with aiosqlite.connect(self.db_path) as db:
+    async def get_leaderboard_page(self, guild_id: int, limit: int,
+                                   after: Optional[Tuple[int, int]] = None) -> List[tuple]:
+        """Get leaderboard rows ranked below an (total, user_id) keyset cursor"""
+        if after is None:
+            return await self.get_leaderboard(limit, guild_id)
+        
+        if self._rankings is not None and _active_transaction.get() is not self:
+            return self._rankings.get(guild_id).after(after, limit)
+        
+        async with self._read() as db:
+            async with db.execute(
+                """SELECT user_id, (balance + bank) as total
+                   FROM economy
+                   WHERE guild_id = :guild_id
+                   AND ((balance + bank) < :total OR ((balance + bank) = :total AND user_id > :user_id))
+                   ORDER BY total DESC, user_id
+                   LIMIT :limit""",
+                {'guild_id': guild_id, 'total': after[0], 'user_id': after[1], 'limit': limit}
+            ) as cursor:
+                return await cursor.fetchall()
+    
+    async def get_rank(self, user_id: int, guild_id: int = 0) -> Optional[int]:
+        """Get user's 1-based leaderboard position, or None without an account"""
+        if self._rankings is not None and _active_transaction.get() is not self:
+            return self._rankings.get(guild_id).rank(user_id)
+        
+        async with self._read() as db:
+            async with db.execute(
+                """SELECT 1 + (
+                       SELECT COUNT(*) FROM economy AS other
+                       WHERE other.guild_id = me.guild_id
+                       AND (other.balance + other.bank > me.balance + me.bank
+                            OR (other.balance + other.bank = me.balance + me.bank AND other.user_id < me.user_id))
+                   )
+                   FROM economy AS me
+                   WHERE me.guild_id = :guild_id AND me.user_id = :user_id""",
+                {'guild_id': guild_id, 'user_id': user_id}
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else None
+    
+    async def get_standing(self, user_id: int, guild_id: int = 0) -> Optional[Dict[str, Any]]:
+        """Get user's rank, total and the accounts directly above and below them"""
+        rank = await self.get_rank(user_id, guild_id)
+        if rank is None:
+            return None
+        
+        # The window of up to three rows centred on the user
+        offset = max(0, rank - 2)
+        if self._rankings is not None and _active_transaction.get() is not self:
+            ranking = self._rankings.get(guild_id)
+            window = ranking.top(3 if rank > 1 else 2, offset)
+            accounts = len(ranking)
+        else:
+            async with self._read() as db:
+                async with db.execute(
+                    """SELECT user_id, (balance + bank) as total
+                       FROM economy
+                       WHERE guild_id = ?
+                       ORDER BY total DESC, user_id
+                       LIMIT ? OFFSET ?""",
+                    (guild_id, 3 if rank > 1 else 2, offset)
+                ) as cursor:
+                    window = [tuple(row) for row in await cursor.fetchall()]
+                async with db.execute("SELECT COUNT(*) FROM economy WHERE guild_id = ?", (guild_id,)) as cursor:
+                    accounts = (await cursor.fetchone())[0]
+        
+        position = rank - 1 - offset
+        return {
+            'rank': rank,
+            'total': window[position][1],
+            'accounts': accounts,
+            'above': window[position - 1] if position > 0 else None,
+            'below': window[position + 1] if position + 1 < len(window) else None,
+        }
+    
+    async def check_cooldown(self, user_id: int, guild_id: int, cooldown_type: str) -> Optional[int]:
+        """Get when a cooldown was last started, in Unix seconds"""
+        async with self._read() as db:
             column = f"last_{cooldown_type}"
             async with db.execute(
                 f"SELECT {column} FROM economy WHERE user_id = ? AND guild_id = ?",
                 (user_id, guild_id)
             ) as cursor:
                 row = await cursor.fetchone()
-                if row and row[0]:
-                    return datetime.fromisoformat(row[0])
-                return None
+                return row[0] if row else None
     
     async def update_cooldown(self, user_id: int, guild_id: int, cooldown_type: str):
         """Update cooldown timestamp"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             column = f"last_{cooldown_type}"
             await db.execute(
                 f"UPDATE economy SET {column} = ? WHERE user_id = ? AND guild_id = ?",
-                (datetime.utcnow().isoformat(), user_id, guild_id)
+                (_now(), user_id, guild_id)
             )
-            await db.commit()
     
     # Reminder functions
     async def add_reminder(self, user_id: int, channel_id: int, message: str, remind_time: datetime):
         """Add a reminder"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute(
                 "INSERT INTO reminders (user_id, channel_id, message, remind_time) VALUES (?, ?, ?, ?)",
-                (user_id, channel_id, message, remind_time.isoformat())
+                (user_id, channel_id, message, _epoch(remind_time))
             )
-            await db.commit()
     
     async def get_due_reminders(self) -> List[Dict[str, Any]]:
         """Get reminders that are due"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
             async with db.execute(
                 "SELECT id, user_id, channel_id, message FROM reminders WHERE remind_time <= ?",
-                (datetime.utcnow().isoformat(),)
+                (_now(),)
             ) as cursor:
                 rows = await cursor.fetchall()
                 return [
@@ -267,23 +984,53 @@ class Database:
     
     async def delete_reminder(self, reminder_id: int):
         """Delete a reminder"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
-            await db.commit()
+    
+    # Warning functions
+    async def add_warning(self, user_id: int, moderator_id: int, reason: str, guild_id: int = 0):
+        """Add a warning to a member"""
+        async with self._write() as db:
+            await db.execute(
+                "INSERT INTO warnings (user_id, guild_id, moderator_id, reason, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (user_id, guild_id, moderator_id, reason, _now())
+            )
+    
+    async def get_warnings(self, user_id: int, guild_id: int = 0) -> List[Dict[str, Any]]:
+        """Get a member's warnings, newest first"""
+        async with self._read() as db:
+            async with db.execute(
+                "SELECT moderator_id, reason, timestamp FROM warnings WHERE guild_id = ? AND user_id = ? ORDER BY timestamp DESC",
+                (guild_id, user_id)
+            ) as cursor:
+                rows = await cursor.fetchall()
+                return [
+                    {'moderator_id': row[0], 'reason': row[1], 'timestamp': row[2]}
+                    for row in rows
+                ]
+    
+    async def get_warning_count(self, user_id: int, guild_id: int = 0) -> int:
+        """Get total warning count for a member"""
+        async with self._read() as db:
+            async with db.execute(
+                "SELECT COUNT(*) FROM warnings WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else 0
     
     # Homework functions
     async def add_homework(self, user_id: int, subject: str, assignment: str, due_date: str):
         """Add homework assignment"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute(
                 "INSERT INTO homework (user_id, subject, assignment, due_date) VALUES (?, ?, ?, ?)",
                 (user_id, subject, assignment, due_date)
             )
-            await db.commit()
     
     async def get_homework(self, user_id: int) -> List[Dict[str, Any]]:
         """Get user's homework"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
             async with db.execute(
                 "SELECT id, subject, assignment, due_date, completed FROM homework WHERE user_id = ?",
                 (user_id,)
@@ -302,23 +1049,21 @@ class Database:
     
     async def complete_homework(self, homework_id: int):
         """Mark homework as complete"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute(
                 "UPDATE homework SET completed = 1 WHERE id = ?",
                 (homework_id,)
             )
-            await db.commit()
     
     async def delete_homework(self, homework_id: int):
         """Delete homework"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute("DELETE FROM homework WHERE id = ?", (homework_id,))
-            await db.commit()
     
     # Server config functions
     async def get_server_config(self, guild_id: int) -> Dict[str, Any]:
         """Get server configuration"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
             async with db.execute(
                 "SELECT welcome_channel, log_channel, prefix FROM server_config WHERE guild_id = ?",
                 (guild_id,)
@@ -335,95 +1080,116 @@ class Database:
     
     async def set_welcome_channel(self, guild_id: int, channel_id: int):
         """Set welcome channel"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute(
-                """INSERT INTO server_config (guild_id, welcome_channel) 
-                   VALUES (?, ?) 
-                   ON CONFLICT(guild_id) 
+                """INSERT INTO server_config (guild_id, welcome_channel)
+                   VALUES (?, ?)
+                   ON CONFLICT(guild_id)
                    DO UPDATE SET welcome_channel = ?""",
                 (guild_id, channel_id, channel_id)
             )
-            await db.commit()
     
     # Shop items functions
-    async def add_shop_item(self, user_id: int, guild_id: int, item_name: str, effect: str, expiry_date: Optional[datetime]):
-        """Add a shop item/boost to user's inventory"""
-        async with aiosqlite.connect(self.db_path) as db:
+    async def add_shop_item(self, user_id: int, guild_id: int, item_name: str, effect: str, expiry_date: Optional[int]):
+        """Add a shop item/boost to user's inventory, expiring at the given Unix time"""
+        async with self._write() as db:
             await db.execute(
                 "INSERT INTO shop_items (user_id, guild_id, item_name, effect, expiry_date) VALUES (?, ?, ?, ?, ?)",
-                (user_id, guild_id, item_name, effect, expiry_date.isoformat() if expiry_date else None)
+                (user_id, guild_id, item_name, effect, expiry_date)
             )
-            await db.commit()
+        
+        # Write through to the boost cache
+        self._after_commit(lambda: self._boosts.add(guild_id, user_id, effect, expiry_date))
     
     async def get_active_boosts(self, user_id: int, guild_id: int) -> List[Dict[str, Any]]:
-        """Get user's active boosts"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Clean up expired items first
-            await db.execute(
-                "DELETE FROM shop_items WHERE expiry_date IS NOT NULL AND expiry_date <= ?",
-                (datetime.utcnow().isoformat(),)
-            )
-            await db.commit()
-            
-            # Get active boosts
+        """Get user's active boosts (expired rows are left to remove_expired_boosts)"""
+        async with self._read() as db:
             async with db.execute(
-                """SELECT item_name, effect, expiry_date 
-                   FROM shop_items 
-                   WHERE user_id = ? AND guild_id = ? 
+                """SELECT item_name, effect, expiry_date
+                   FROM shop_items
+                   WHERE user_id = ? AND guild_id = ?
                    AND (expiry_date IS NULL OR expiry_date > ?)""",
-                (user_id, guild_id, datetime.utcnow().isoformat())
+                (user_id, guild_id, _now())
             ) as cursor:
                 rows = await cursor.fetchall()
                 return [
-                    {
-                        'item_name': row[0],
-                        'effect': row[1],
-                        'expiry_date': datetime.fromisoformat(row[2]) if row[2] else None
-                    }
+                    {'item_name': row[0], 'effect': row[1], 'expiry_date': row[2]}
                     for row in rows
                 ]
     
+    async def get_boost_effects(self, user_id: int, guild_id: int) -> frozenset:
+        """Get the effects of all of user's active boosts, cached in memory"""
+        effects = self._boosts.get(guild_id, user_id)
+        if effects is not None:
+            return effects
+        
+        version = self._boosts.version
+        async with self._read() as db:
+            async with db.execute(
+                """SELECT effect, expiry_date
+                   FROM shop_items
+                   WHERE user_id = ? AND guild_id = ?
+                   AND (expiry_date IS NULL OR expiry_date > ?)""",
+                (user_id, guild_id, _now())
+            ) as cursor:
+                boosts = await cursor.fetchall()
+        
+        if self._boosts.version == version:
+            # Only cache if no boost was written while we were reading
+            self._boosts.load(guild_id, user_id, boosts)
+        return frozenset(effect for effect, _ in boosts)
+    
     async def has_active_boost(self, user_id: int, guild_id: int, effect: str) -> bool:
         """Check if user has a specific active boost"""
-        boosts = await self.get_active_boosts(user_id, guild_id)
-        return any(boost['effect'] == effect for boost in boosts)
+        return effect in await self.get_boost_effects(user_id, guild_id)
+    
+    async def clear_boosts(self, user_id: int, guild_id: int) -> int:
+        """Delete all of user's boosts and return how many were removed"""
+        async with self._write() as db:
+            cursor = await db.execute(
+                "DELETE FROM shop_items WHERE user_id = ? AND guild_id = ?",
+                (user_id, guild_id)
+            )
+            removed = cursor.rowcount
+            await cursor.close()
+        
+        self._after_commit(lambda: self._boosts.invalidate(guild_id, user_id))
+        return removed
     
     async def remove_expired_boosts(self):
         """Remove all expired boosts from database"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute(
                 "DELETE FROM shop_items WHERE expiry_date IS NOT NULL AND expiry_date <= ?",
-                (datetime.utcnow().isoformat(),)
+                (_now(),)
             )
-            await db.commit()
     
     # Inventory functions
     async def add_inventory_item(self, user_id: int, guild_id: int, item_name: str, item_type: str, quantity: int = 1):
         """Add an item to user's inventory"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             # Check if item already exists
             async with db.execute(
                 "SELECT id, quantity FROM inventory WHERE user_id = ? AND guild_id = ? AND item_name = ?",
                 (user_id, guild_id, item_name)
             ) as cursor:
                 row = await cursor.fetchone()
-                if row:
-                    # Update quantity
-                    await db.execute(
-                        "UPDATE inventory SET quantity = quantity + ? WHERE id = ?",
-                        (quantity, row[0])
-                    )
-                else:
-                    # Insert new item
-                    await db.execute(
-                        "INSERT INTO inventory (user_id, guild_id, item_name, item_type, quantity) VALUES (?, ?, ?, ?, ?)",
-                        (user_id, guild_id, item_name, item_type, quantity)
-                    )
-            await db.commit()
+            if row:
+                # Update quantity
+                await db.execute(
+                    "UPDATE inventory SET quantity = quantity + ? WHERE id = ?",
+                    (quantity, row[0])
+                )
+            else:
+                # Insert new item
+                await db.execute(
+                    "INSERT INTO inventory (user_id, guild_id, item_name, item_type, quantity) VALUES (?, ?, ?, ?, ?)",
+                    (user_id, guild_id, item_name, item_type, quantity)
+                )
     
     async def get_inventory(self, user_id: int, guild_id: int) -> List[Dict[str, Any]]:
         """Get user's inventory"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
             async with db.execute(
                 "SELECT item_name, item_type, quantity FROM inventory WHERE user_id = ? AND guild_id = ? AND quantity > 0",
                 (user_id, guild_id)
@@ -440,7 +1206,7 @@ class Database:
     
     async def get_item_quantity(self, user_id: int, guild_id: int, item_name: str) -> int:
         """Get quantity of specific item in inventory"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
             async with db.execute(
                 "SELECT quantity FROM inventory WHERE user_id = ? AND guild_id = ? AND item_name = ?",
                 (user_id, guild_id, item_name)
@@ -448,81 +1214,212 @@ class Database:
                 row = await cursor.fetchone()
                 return row[0] if row else 0
     
+    async def get_item_quantities(self, guild_id: int, pairs: List[Tuple[int, str]]) -> Dict[Tuple[int, str], int]:
+        """Get quantities for several (user_id, item_name) pairs in one query"""
+        pairs = list(dict.fromkeys(pairs))
+        quantities = {pair: 0 for pair in pairs}
+        if not pairs:
+            return quantities
+        
+        # Plain IN lists seek the (user_id, guild_id, item_name) index for every
+        # combination; a row-value IN (VALUES ...) would scan the whole table
+        user_ids = list(dict.fromkeys(user_id for user_id, _ in pairs))
+        item_names = list(dict.fromkeys(item_name for _, item_name in pairs))
+        async with self._read() as db:
+            async with db.execute(
+                f"""SELECT user_id, item_name, SUM(quantity)
+                    FROM inventory
+                    WHERE user_id IN ({", ".join("?" for _ in user_ids)})
+                    AND guild_id = ?
+                    AND item_name IN ({", ".join("?" for _ in item_names)})
+                    GROUP BY user_id, item_name""",
+                [*user_ids, guild_id, *item_names]
+            ) as cursor:
+                for user_id, item_name, quantity in await cursor.fetchall():
+                    if (user_id, item_name) in quantities:
+                        quantities[(user_id, item_name)] = quantity
+        return quantities
+    
     async def use_inventory_item(self, user_id: int, guild_id: int, item_name: str, quantity: int = 1) -> bool:
         """Use/consume an item from inventory"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Check if user has enough
-            current_qty = await self.get_item_quantity(user_id, guild_id, item_name)
-            if current_qty < quantity:
-                return False
-            
-            # Reduce quantity
-            await db.execute(
-                "UPDATE inventory SET quantity = quantity - ? WHERE user_id = ? AND guild_id = ? AND item_name = ?",
-                (quantity, user_id, guild_id, item_name)
+        async with self._write() as db:
+            # Reduce quantity only if user has enough
+            cursor = await db.execute(
+                """UPDATE inventory SET quantity = quantity - ?
+                   WHERE user_id = ? AND guild_id = ? AND item_name = ? AND quantity >= ?""",
+                (quantity, user_id, guild_id, item_name, quantity)
             )
-            await db.commit()
-            return True
+            return cursor.rowcount > 0
     
     async def remove_inventory_item(self, user_id: int, guild_id: int, item_name: str):
         """Remove an item completely from inventory"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute(
                 "DELETE FROM inventory WHERE user_id = ? AND guild_id = ? AND item_name = ?",
                 (user_id, guild_id, item_name)
             )
-            await db.commit()
+    
+    async def clear_inventory(self, user_id: int, guild_id: int) -> int:
+        """Delete user's whole inventory and return how many item stacks were removed"""
+        async with self._write() as db:
+            cursor = await db.execute(
+                "DELETE FROM inventory WHERE user_id = ? AND guild_id = ?",
+                (user_id, guild_id)
+            )
+            removed = cursor.rowcount
+            await cursor.close()
+        return removed
+    
+    async def reset_user(self, user_id: int, guild_id: int, balance: int = Config.STARTING_BALANCE) -> Dict[str, int]:
+        """Reset balance and wipe inventory and boosts in one transaction"""
+        async with self.transaction():
+            await self.set_balance(user_id, guild_id, balance)
+            items = await self.clear_inventory(user_id, guild_id)
+            boosts = await self.clear_boosts(user_id, guild_id)
+        return {'items': items, 'boosts': boosts}
     
     # Rob history functions
     async def add_rob_attempt(self, robber_id: int, victim_id: int, guild_id: int, amount: int, success: bool):
         """Record a rob attempt"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write() as db:
             await db.execute(
-                "INSERT INTO rob_history (robber_id, victim_id, guild_id, amount, success) VALUES (?, ?, ?, ?, ?)",
-                (robber_id, victim_id, guild_id, amount, success)
+                """INSERT INTO rob_history (robber_id, victim_id, guild_id, amount, success, timestamp)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (robber_id, victim_id, guild_id, amount, success, _now())
             )
-            await db.commit()
     
-    async def get_last_rob(self, user_id: int, guild_id: int) -> Optional[datetime]:
-        """Get last time user robbed someone"""
-        async with aiosqlite.connect(self.db_path) as db:
+    async def get_last_rob(self, user_id: int, guild_id: int) -> Optional[int]:
+        """Get last time user robbed someone, in Unix seconds"""
+        async with self._read() as db:
             async with db.execute(
-                "SELECT timestamp FROM rob_history WHERE robber_id = ? AND guild_id = ? ORDER BY timestamp DESC LIMIT 1",
-                (user_id, guild_id)
+                "SELECT last_rob FROM rob_stats WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
             ) as cursor:
                 row = await cursor.fetchone()
-                if row:
-                    return datetime.fromisoformat(row[0])
-                return None
+                return row[0] if row else None
+    
+    async def get_user_snapshot(self, user_id: int, guild_id: int) -> Dict[str, Any]:
+        """Get a user's account, cooldowns, inventory, boosts and rob stats in one read.
+        
+        Everything comes from a single connection and read transaction, so the
+        parts are consistent with each other. A missing account is reported
+        with the starting balance and is not created.
+        """
+        params = {'user_id': user_id, 'guild_id': guild_id, 'now': _now()}
+        async with self._read() as db:
+            own_snapshot = not db.in_transaction
+            if own_snapshot:
+                await db.execute("BEGIN")
+            try:
+                async with db.execute(
+                    """SELECT e.user_id, e.balance, e.bank, e.last_daily, e.last_work,
+                              COALESCE(r.attempts, 0), COALESCE(r.successful, 0), COALESCE(r.times_robbed, 0)
+                       FROM (SELECT 1)
+                       LEFT JOIN economy AS e ON e.user_id = :user_id AND e.guild_id = :guild_id
+                       LEFT JOIN rob_stats AS r ON r.user_id = :user_id AND r.guild_id = :guild_id""",
+                    params
+                ) as cursor:
+                    account = await cursor.fetchone()
+                
+                async with db.execute(
+                    """SELECT item_name, item_type, quantity FROM inventory
+                       WHERE user_id = :user_id AND guild_id = :guild_id AND quantity > 0""",
+                    params
+                ) as cursor:
+                    items = await cursor.fetchall()
+                
+                async with db.execute(
+                    """SELECT item_name, effect, expiry_date FROM shop_items
+                       WHERE user_id = :user_id AND guild_id = :guild_id
+                       AND (expiry_date IS NULL OR expiry_date > :now)""",
+                    params
+                ) as cursor:
+                    boosts = await cursor.fetchall()
+            finally:
+                if own_snapshot:
+                    await db.execute("COMMIT")
+        
+        exists = account[0] is not None
+        attempts, successful, times_robbed = account[5], account[6], account[7]
+        return {
+            'exists': exists,
+            'balance': account[1] if exists else Config.STARTING_BALANCE,
+            'bank': account[2] if exists else 0,
+            'last_daily': account[3],
+            'last_work': account[4],
+            'inventory': [
+                {'item_name': row[0], 'item_type': row[1], 'quantity': row[2]}
+                for row in items
+            ],
+            'boosts': [
+                {'item_name': row[0], 'effect': row[1], 'expiry_date': row[2]}
+                for row in boosts
+            ],
+            'rob_stats': {
+                'total_attempts': attempts,
+                'successful': successful,
+                'failed': attempts - successful,
+                'times_robbed': times_robbed
+            }
+        }
     
     async def get_rob_stats(self, user_id: int, guild_id: int) -> Dict[str, int]:
         """Get user's rob statistics"""
-        async with aiosqlite.connect(self.db_path) as db:
-            # Total robs attempted
+        async with self._read() as db:
             async with db.execute(
-                "SELECT COUNT(*) FROM rob_history WHERE robber_id = ? AND guild_id = ?",
-                (user_id, guild_id)
+                "SELECT attempts, successful, times_robbed FROM rob_stats WHERE guild_id = ? AND user_id = ?",
+                (guild_id, user_id)
             ) as cursor:
-                total = (await cursor.fetchone())[0]
-            
-            # Successful robs
-            async with db.execute(
-                "SELECT COUNT(*) FROM rob_history WHERE robber_id = ? AND guild_id = ? AND success = 1",
-                (user_id, guild_id)
-            ) as cursor:
-                successful = (await cursor.fetchone())[0]
-            
-            # Times robbed
+                row = await cursor.fetchone()
+        
+        attempts, successful, times_robbed = row if row else (0, 0, 0)
+        return {
+            'total_attempts': attempts,
+            'successful': successful,
+            'failed': attempts - successful,
+            'times_robbed': times_robbed
+        }
+    
+    async def compact_rob_history(self, retention_days: int = Config.ROB_HISTORY_RETENTION_DAYS,
+                                  batch_size: int = 5000) -> int:
+        """Delete raw rob rows older than the retention window and return how many went.
+        
+        Totals survive in rob_stats. Rows go in batches so the write lock is
+        released between them.
+        """
+        cutoff = _now() - retention_days * 86400
+        removed = 0
+        while True:
+            async with self._write() as db:
+                cursor = await db.execute(
+                    """DELETE FROM rob_history WHERE id IN (
+                           SELECT id FROM rob_history WHERE timestamp < ? LIMIT ?
+                       )""",
+                    (cutoff, batch_size)
+                )
+                deleted = cursor.rowcount
+                await cursor.close()
+            removed += deleted
+            if deleted < batch_size:
+                return removed
+    
+    # Steam functions
+    async def get_steam_id(self, vanity: str, max_age: int = Config.STEAM_VANITY_TTL) -> Optional[str]:
+        """Get a stored vanity URL resolution, unless it's older than max_age seconds"""
+        async with self._read() as db:
             async with db.execute(
-                "SELECT COUNT(*) FROM rob_history WHERE victim_id = ? AND guild_id = ?",
-                (user_id, guild_id)
+                "SELECT steam_id FROM steam_vanity WHERE vanity = ? AND resolved_at > ?",
+                (vanity, _now() - max_age)
             ) as cursor:
-                times_robbed = (await cursor.fetchone())[0]
-            
-            return {
-                'total_attempts': total,
-                'successful': successful,
-                'failed': total - successful,
-                'times_robbed': times_robbed
-            }
+                row = await cursor.fetchone()
+                return row[0] if row else None
+    
+    async def set_steam_id(self, vanity: str, steam_id: str):
+        """Store a vanity URL resolution"""
+        async with self._write() as db:
+            await db.execute(
+                """INSERT INTO steam_vanity (vanity, steam_id, resolved_at) VALUES (?, ?, ?)
+                   ON CONFLICT(vanity) DO UPDATE SET steam_id = excluded.steam_id, resolved_at = excluded.resolved_at""",
+                (vanity, steam_id, _now())
+            )
 
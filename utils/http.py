@@ -0,0 +1,252 @@
+"""
+Shared HTTP client for MegaBot
+One pooled aiohttp session for every outbound API call, paced per host
+"""
+
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Hashable, Optional, Tuple
+import aiohttp
+from yarl import URL
+from config import Config
+
+logger = logging.getLogger('MegaBot.HTTP')
+
+# Responses worth retrying, and the subset that mean "slow down"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+def _parse_host_rates(spec: str) -> Dict[str, Tuple[float, int]]:
+    """Parse "host=rate:burst,..." into {host: (requests per second, burst)}"""
+    rates = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        host, _, limit = entry.partition('=')
+        rate, _, burst = limit.partition(':')
+        rates[host.strip().lower()] = (float(rate), int(burst or 1))
+    return rates
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Paces requests to one host; also holds any pause a Retry-After asked for"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        # asyncio.Lock wakes waiters in arrival order, so the queue is FIFO
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+    
+    def pause(self, seconds: float):
+        """Hold every request to this host for at least `seconds`"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    async def acquire(self) -> float:
+        """Wait for a token and return how many seconds that took"""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    delay = self._paused_until - now
+                    if delay <= 0:
+                        if self.rate <= 0:
+                            return now - started
+                        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                        self._updated = now
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            return now - started
+                        delay = (1 - self._tokens) / self.rate
+                    await asyncio.sleep(delay)
+        finally:
+            self.waiting -= 1
+
+class _HostState:
+    """Bucket and counters for one upstream host"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.wait_time = 0.0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus the current queue depth"""
+        return {
+            'rate': self.bucket.rate,
+            'queued': self.bucket.waiting,
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'retries': self.retries,
+            'coalesced': self.coalesced,
+            'failures': self.failures,
+            'wait_seconds': round(self.wait_time, 3),
+        }
+
+class HTTPClient:
+    """Bot-wide aiohttp session with per-host rate limits, retries and request coalescing"""
+    
+    def __init__(self, limit: int = Config.HTTP_POOL_LIMIT, limit_per_host: int = Config.HTTP_LIMIT_PER_HOST,
+                 timeout: float = Config.HTTP_TIMEOUT, connect_timeout: float = Config.HTTP_CONNECT_TIMEOUT,
+                 max_retries: int = Config.HTTP_MAX_RETRIES):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.host_rates = _parse_host_rates(Config.HTTP_HOST_RATES)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._hosts: Dict[str, _HostState] = {}
+        # Identical GETs in flight, keyed by method, URL and headers
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+    
+    async def start(self):
+        """Open the session; must run inside the event loop"""
+        if self._session is not None:
+            return
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=Config.HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=Config.HTTP_KEEPALIVE_TIMEOUT
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers={'User-Agent': Config.HTTP_USER_AGENT}
+        )
+        logger.info(f"HTTP client started ({self.limit_per_host} connections per host)")
+    
+    async def close(self):
+        """Close the session and every pooled connection"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The underlying session, for callers that need more than JSON"""
+        if self._session is None:
+            raise RuntimeError("HTTP client is not started")
+        return self._session
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth and throttle/retry counters per host"""
+        # Called from the API thread while the bot loop may be adding hosts
+        return {host: state.stats() for host, state in list(self._hosts.items())}
+    
+    def _host(self, url: URL) -> _HostState:
+        host = (url.host or '').lower()
+        state = self._hosts.get(host)
+        if state is None:
+            rate, burst = self.host_rates.get(host, (Config.HTTP_DEFAULT_RATE, Config.HTTP_DEFAULT_BURST))
+            state = self._hosts[host] = _HostState(rate, burst)
+        return state
+    
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(Config.HTTP_BACKOFF_MAX, Config.HTTP_BACKOFF_BASE * 2 ** attempt))
+    
+    async def request_json(self, method: str, url: str, coalesce: bool = False, **kwargs) -> Tuple[int, Any]:
+        """Send a request and return (status, decoded JSON body or None if status isn't 200).
+        
+        With coalesce=True, concurrent identical GETs share one upstream
+        request; leave it off for endpoints that answer randomly. Throttled
+        and failed requests are retried; the final status is returned if
+        retries run out.
+        """
+        params = kwargs.pop('params', None)
+        target = URL(url).update_query(params) if params else URL(url)
+        if not coalesce or method != 'GET' or set(kwargs) - {'headers'}:
+            return await self._send(method, target, **kwargs)
+        
+        key = (method, str(target), tuple(sorted((kwargs.get('headers') or {}).items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._send(method, target, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._request_done(key, done))
+        else:
+            self._host(target).coalesced += 1
+        # Shielded so one caller giving up doesn't cancel the request for the others
+        return await asyncio.shield(task)
+    
+    def _request_done(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Retrieve the exception even if every waiter has gone
+            task.exception()
+    
+    async def _send(self, method: str, url: URL, **kwargs) -> Tuple[int, Any]:
+        """Send one logical request through the host's bucket, retrying as allowed"""
+        host = self._host(url)
+        # Only retry what is safe to repeat: GETs always, anything on an explicit throttle
+        idempotent = method in ('GET', 'HEAD')
+        
+        for attempt in range(self.max_retries + 1):
+            host.wait_time += await host.bucket.acquire()
+            host.requests += 1
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    status = response.status
+                    if status == 200:
+                        return status, await response.json(content_type=None)
+                    # Drain the body so the connection goes back to the pool
+                    await response.read()
+                    retry_after = _retry_after(response.headers.get('Retry-After'))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not idempotent or attempt == self.max_retries:
+                    host.failures += 1
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if status not in RETRY_STATUSES:
+                    return status, None
+                if status in THROTTLE_STATUSES:
+                    host.throttled += 1
+                
+                retryable = idempotent or status in THROTTLE_STATUSES
+                too_long = retry_after is not None and retry_after > Config.HTTP_RETRY_AFTER_MAX
+                if retry_after is not None:
+                    # Everyone queued for this host waits, not just this request
+                    host.bucket.pause(min(retry_after, Config.HTTP_RETRY_AFTER_MAX))
+                if not retryable or too_long or attempt == self.max_retries:
+                    host.failures += 1
+                    logger.warning(f"{method} {url.host} gave up with HTTP {status} after {attempt + 1} attempt(s)")
+                    return status, None
+                delay = 0 if retry_after is not None else self._backoff(attempt)
+            
+            host.retries += 1
+            if delay:
+                await asyncio.sleep(delay)
+    
+    async def get_json(self, url: str, coalesce: bool = False, **kwargs) -> Tuple[int, Any]:
+        """GET a JSON resource; coalesce=True shares it with identical GETs in flight"""
+        return await self.request_json('GET', url, coalesce=coalesce, **kwargs)
+    
+    async def post_json(self, url: str, **kwargs) -> Tuple[int, Any]:
+        """POST and decode a JSON response"""
+        return await self.request_json('POST', url, **kwargs)
@@ -0,0 +1,193 @@
+"""
+In-memory economy rankings for MegaBot
+Per-guild order-statistics over balance + bank, kept current by Database
+"""
+
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+    
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: List[Optional['_Node']] = [None] * level
+        # width[i] = how many positions next[i] is ahead of this node
+        self.width: List[int] = [1] * level
+
+class RankedSkipList:
+    """Indexable skip list: O(log n) insert, remove, rank and positional lookup"""
+    
+    MAX_LEVEL = 32
+    
+    def __init__(self):
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+    
+    def insert(self, key: Any):
+        """Insert a key (keys must be unique)"""
+        level = self._random_level()
+        if level > self._level:
+            # Unused head levels point past the end of the list
+            for i in range(self._level, level):
+                self._head.width[i] = self._size + 1
+            self._level = level
+        
+        # Last node before key on each level, and its position (head is 0)
+        update = [self._head] * self._level
+        positions = [0] * self._level
+        node, position = self._head, 0
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+            update[i] = node
+            positions[i] = position
+        
+        new = _Node(key, level)
+        new_position = positions[0] + 1
+        for i in range(self._level):
+            prev = update[i]
+            if i < level:
+                new.next[i] = prev.next[i]
+                new.width[i] = prev.width[i] + positions[i] + 1 - new_position
+                prev.next[i] = new
+                prev.width[i] = new_position - positions[i]
+            else:
+                prev.width[i] += 1
+        self._size += 1
+    
+    def remove(self, key: Any):
+        """Remove a key, raising KeyError if it is absent"""
+        update = [self._head] * self._level
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.next[i].key < key:
+                node = node.next[i]
+            update[i] = node
+        
+        target = update[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        
+        for i in range(self._level):
+            prev = update[i]
+            if i < len(target.next):
+                prev.width[i] += target.width[i] - 1
+                prev.next[i] = target.next[i]
+            else:
+                prev.width[i] -= 1
+        self._size -= 1
+    
+    def index(self, key: Any) -> int:
+        """Number of keys smaller than key"""
+        node, position = self._head, 0
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.next[i].key < key:
+                position += node.width[i]
+                node = node.next[i]
+        return position
+    
+    def slice(self, start: int, count: int) -> List[Any]:
+        """Up to count keys starting at position start"""
+        if start < 0 or start >= self._size or count <= 0:
+            return []
+        
+        # Walk down to the node at position start + 1 (the head is position 0)
+        node, remaining = self._head, start + 1
+        for i in reversed(range(self._level)):
+            while node.next[i] is not None and node.width[i] <= remaining:
+                remaining -= node.width[i]
+                node = node.next[i]
+        
+        keys = []
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+class GuildRanking:
+    """One guild's accounts ordered by total wealth, ties broken by user ID"""
+    
+    def __init__(self):
+        self.totals: Dict[int, int] = {}
+        self._order = RankedSkipList()
+    
+    def __len__(self) -> int:
+        return len(self.totals)
+    
+    def update(self, user_id: int, total: int):
+        """Record a user's current total"""
+        previous = self.totals.get(user_id)
+        if previous == total:
+            return
+        if previous is not None:
+            self._order.remove((-previous, user_id))
+        self._order.insert((-total, user_id))
+        self.totals[user_id] = total
+    
+    def discard(self, user_id: int):
+        """Drop a user from the ranking"""
+        previous = self.totals.pop(user_id, None)
+        if previous is not None:
+            self._order.remove((-previous, user_id))
+    
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based rank of a user, or None if they have no account"""
+        total = self.totals.get(user_id)
+        if total is None:
+            return None
+        return self._order.index((-total, user_id)) + 1
+    
+    def top(self, count: int, offset: int = 0) -> List[Tuple[int, int]]:
+        """(user_id, total) rows starting offset places from the top"""
+        return [(user_id, -negative) for negative, user_id in self._order.slice(offset, count)]
+    
+    def after(self, cursor: Tuple[int, int], count: int) -> List[Tuple[int, int]]:
+        """(user_id, total) rows ranked below a (total, user_id) cursor"""
+        total, user_id = cursor
+        # Everything strictly after the cursor key, even if that account has since moved
+        return self.top(count, self._order.index((-total, user_id + 1)))
+
+class Leaderboard:
+    """Rankings for every guild"""
+    
+    def __init__(self):
+        self._guilds: Dict[int, GuildRanking] = {}
+    
+    def seed(self, rows: List[Tuple[int, int, int]]):
+        """Load (guild_id, user_id, total) rows, replacing what was there"""
+        self._guilds.clear()
+        for guild_id, user_id, total in rows:
+            self.update(guild_id, user_id, total)
+    
+    def get(self, guild_id: int) -> GuildRanking:
+        """Ranking for one guild to read from, without registering unknown guilds"""
+        return self._guilds.get(guild_id) or GuildRanking()
+    
+    def guild(self, guild_id: int) -> GuildRanking:
+        """Ranking for one guild to write to, created on first use"""
+        ranking = self._guilds.get(guild_id)
+        if ranking is None:
+            ranking = self._guilds[guild_id] = GuildRanking()
+        return ranking
+    
+    def update(self, guild_id: int, user_id: int, total: int):
+        """Record a user's current total in a guild"""
+        self.guild(guild_id).update(user_id, total)
+    
+    def discard(self, guild_id: int, user_id: int):
+        """Drop a user's account from a guild's ranking"""
+        ranking = self._guilds.get(guild_id)
+        if ranking is not None:
+            ranking.discard(user_id)